@@ -9,6 +9,7 @@ from .bases import (
     TemporalActivityMixin)
 from .session import temporal_session, persist_history, is_temporal_session
 from .clock import add_clock
-from .util import get_activity_clock_backref, \
+from .util import bulk_load_history, \
+    get_activity_clock_backref, \
     get_history_model
 from .core import TemporalModel
@@ -6,6 +6,7 @@ import datetime as dt
 import typing
 import uuid
 import warnings
+import weakref
 
 import sqlalchemy as sa
 import sqlalchemy.dialects.postgresql as sap
@@ -18,6 +19,10 @@ from temporal_sqlalchemy.metadata import STRICT_MODE_KEY
 
 _ClockSet = collections.namedtuple('_ClockSet', ('effective', 'vclock'))
 
+# every class mapped through temporal_map; lets the session hooks bail out
+# immediately in applications that never temporalize anything
+TEMPORAL_CLASS_REGISTRY = weakref.WeakSet()
+
 T_PROPS = typing.TypeVar(
     'T_PROP', orm.RelationshipProperty, orm.ColumnProperty)
 
@@ -50,6 +55,12 @@ class TemporalActivityMixin:
 
 class TemporalOption:
     """ Temporal Options stored on Model """
+
+    # one instance per temporalized class, read on every flush -- slots keep
+    # the attribute reads off the instance-dict path
+    __slots__ = ('history_models', 'temporal_props', 'clock_model',
+                 'activity_cls', 'allow_persist_on_commit')
+
     def __init__(self,
                  history_models: typing.Dict[T_PROPS, nine.Type[TemporalProperty]],
                  temporal_props: typing.Iterable[T_PROPS],
@@ -109,6 +120,7 @@ class TemporalOption:
         new_clock = self.make_clock(timestamp, new_tick)
         attr = {'entity': clocked}
 
+        new_history_rows = []
         for prop, cls in self.history_models.items():
             value = self._get_prop_value(clocked, prop)
 
@@ -119,10 +131,9 @@ class TemporalOption:
 
                 self._cap_previous_history_row(clocked, new_clock, cls)
 
-                # Add new history row
                 hist = attr.copy()
                 hist[prop.key] = value
-                session.add(
+                new_history_rows.append(
                     cls(
                         vclock=new_clock.vclock,
                         effective=new_clock.effective,
@@ -130,33 +141,45 @@ class TemporalOption:
                     ),
                 )
 
-    def record_history_on_commit(self,
-                                 clocked: 'Clocked',
-                                 changes: dict,
-                                 session: orm.Session,
-                                 timestamp: dt.datetime):
-        """record all history for a given clocked object"""
-        new_tick = self._get_new_tick(clocked)
-
-        new_clock = self.make_clock(timestamp, new_tick)
-        attr = {'entity': clocked}
-
-        for prop, cls in self.history_models.items():
-            if prop in changes:
-                value = changes[prop]
-
-                self._cap_previous_history_row(clocked, new_clock, cls)
-
-                # Add new history row
-                hist = attr.copy()
-                hist[prop.key] = value
-                session.add(
-                    cls(
-                        vclock=new_clock.vclock,
-                        effective=new_clock.effective,
-                        **hist,
-                    ),
-                )
+        # add all new history rows in one call so the flush can batch the
+        # inserts per history table
+        if new_history_rows:
+            session.add_all(new_history_rows)
+
+    def record_history_on_commit_bulk(self,
+                                      batch: typing.Iterable[typing.Tuple['Clocked', dict]],
+                                      session: orm.Session,
+                                      timestamp: dt.datetime):
+        """record all history for many clocked objects of the same class"""
+        history_model_items = self.history_models.items()
+
+        new_history_rows = []
+        for clocked, changes in batch:
+            new_tick = self._get_new_tick(clocked)
+
+            new_clock = self.make_clock(timestamp, new_tick)
+            attr = {'entity': clocked}
+
+            for prop, cls in history_model_items:
+                if prop in changes:
+                    value = changes[prop]
+
+                    self._cap_previous_history_row(clocked, new_clock, cls)
+
+                    hist = attr.copy()
+                    hist[prop.key] = value
+                    new_history_rows.append(
+                        cls(
+                            vclock=new_clock.vclock,
+                            effective=new_clock.effective,
+                            **hist,
+                        ),
+                    )
+
+        # add the whole batch in one call so the flush can batch the inserts
+        # per history table; every batch entry carries at least one tracked
+        # change, so there is always something to add
+        session.add_all(new_history_rows)
 
     def get_history(self, clocked: 'Clocked'):
         """ return history & notify if the vclock is actually changed for this  """
@@ -1,4 +1,5 @@
 """ clock and history handling """
+import functools
 import itertools
 import typing
 import uuid
@@ -13,6 +14,7 @@ import sqlalchemy.orm as orm
 from temporal_sqlalchemy import nine, util
 from temporal_sqlalchemy.bases import (
     T_PROPS,
+    TEMPORAL_CLASS_REGISTRY,
     Clocked,
     TemporalOption,
     TemporalActivityMixin,
@@ -27,16 +29,20 @@ def temporal_map(*track, mapper: orm.Mapper, activity_class=None,
 
     cls = mapper.class_
     entity_table = mapper.local_table
-    # get things defined on Temporal:
-    tracked_props = frozenset(
-        mapper.get_property(prop) for prop in track
-    )
-    # make sure all temporal properties have active_history (always loaded)
-    for prop in tracked_props:
-        getattr(cls, prop.key).impl.active_history = True
-
     schema = schema or entity_table.schema
 
+    # get things defined on Temporal, make sure all temporal properties have
+    # active_history (always loaded) and build their history models -- all in
+    # a single pass over the tracked properties
+    tracked_props = []
+    history_models = {}
+    for prop_name in track:
+        prop = mapper.get_property(prop_name)
+        tracked_props.append(prop)
+        getattr(cls, prop.key).impl.active_history = True
+        history_models[prop] = build_history_class(cls, prop, schema)
+    tracked_props = frozenset(tracked_props)
+
     clock_table = build_clock_table(
         entity_table,
         entity_table.metadata,
@@ -86,11 +92,6 @@ def temporal_map(*track, mapper: orm.Mapper, activity_class=None,
                                     entity_table.metadata,
                                     clock_properties)
 
-    history_models = {
-        p: build_history_class(cls, p, schema)
-        for p in tracked_props
-    }
-
     cls.temporal_options = TemporalOption(
         temporal_props=tracked_props,
         history_models=history_models,
@@ -98,6 +99,10 @@ def temporal_map(*track, mapper: orm.Mapper, activity_class=None,
         activity_cls=activity_class,
         allow_persist_on_commit=allow_persist_on_commit,
     )
+    # type tag consumed by session._temporal_models as a cheap alternative
+    # to an isinstance check on every object in the session
+    cls.__temporal_tagged__ = True
+    TEMPORAL_CLASS_REGISTRY.add(cls)
 
     event.listen(cls, 'init', init_clock)
 
@@ -105,12 +110,13 @@ def temporal_map(*track, mapper: orm.Mapper, activity_class=None,
 def init_clock(obj: Clocked, args, kwargs):  # pylint: disable=unused-argument
     """ initialize a model instance, set clocks to first tick (1) """
     kwargs.setdefault('vclock', 1)
-    initial_tick = obj.temporal_options.clock_model(
+    options = obj.temporal_options
+    initial_tick = options.clock_model(
         tick=kwargs['vclock'],
         entity=obj,
     )
 
-    if obj.temporal_options.activity_cls and 'activity' not in kwargs:
+    if options.activity_cls and 'activity' not in kwargs:
         raise ValueError(
             "%r missing keyword argument: activity" % obj.__class__)
 
@@ -245,11 +251,15 @@ def build_clock_table(entity_table: sa.Table,
     return clock_table
 
 
+@functools.lru_cache(maxsize=None)
 def build_history_class(
         cls: declarative.DeclarativeMeta,
         prop: T_PROPS,
         schema: str = None) -> nine.Type[TemporalProperty]:
-    """build a sqlalchemy model for given prop"""
+    """build a sqlalchemy model for given prop
+
+    memoized on (cls, prop, schema) -- several models track the same
+    property sets and repeat calls would otherwise rebuild the class"""
     class_name = "%s%s_%s" % (cls.__name__, 'History', prop.key)
     table = build_history_table(cls, prop, schema)
     base_classes = (
@@ -295,11 +305,15 @@ def _exclusion_in_uuid(type_, name):
     return sa.cast(sa.text(name), sap.TEXT), '='
 
 
+@functools.lru_cache(maxsize=None)
 def build_history_table(
         cls: declarative.DeclarativeMeta,
         prop: T_PROPS,
         schema: str = None) -> sa.Table:
-    """build a sqlalchemy history table for given prop"""
+    """build a sqlalchemy history table for given prop
+
+    memoized on (cls, prop, schema); the keep_existing table construction
+    already deduplicates by name, this also skips re-copying the columns"""
     if isinstance(prop, orm.RelationshipProperty):
         columns = [util.copy_column(column) for column in prop.local_columns]
     else:
@@ -310,7 +324,7 @@ def build_history_table(
     table_name = util.truncate_identifier(history_table_name)
     # Build the foreign key(s), specifically adding an index since we may use
     # a casted foreign key in our constraints. See _exclusion_in_uuid
-    entity_foreign_keys = list(util.foreign_key_to(local_table, index=True))
+    entity_foreign_keys = util.foreign_key_to(local_table, index=True)
     entity_constraints = [
         _exclusion_in(fk.type, fk.key)
         for fk in entity_foreign_keys
@@ -6,21 +6,26 @@ import sqlalchemy.orm as orm
 from temporal_sqlalchemy import bases, clock
 
 
+def _temporal_mapper(cls_, *args, **kwargs):
+    """ map a model class and install its temporal tracking """
+    options = cls_.Temporal
+
+    mp = orm.mapper(cls_, *args, **kwargs)
+    clock.temporal_map(
+        *options.track,
+        mapper=mp,
+        activity_class=getattr(options, 'activity_class'),
+        schema=getattr(options, 'schema'))
+    return mp
+
+
 class TemporalModel(bases.Clocked):
     """ Mixin Class the enable temporal history for a sqlalchemy model """
     @declarative.declared_attr
     def __mapper_cls__(cls):  # pylint: disable=no-self-argument
+        # declared attrs are resolved before the table is set up, so this
+        # fails fast for subclasses that forget their Temporal options --
+        # the shared mapper function itself is only built once
         assert hasattr(cls, 'Temporal')
 
-        def mapper(cls_, *args, **kwargs):
-            options = cls_.Temporal
-
-            mp = orm.mapper(cls_, *args, **kwargs)
-            clock.temporal_map(
-                *options.track,
-                mapper=mp,
-                activity_class=getattr(options, 'activity_class'),
-                schema=getattr(options, 'schema'))
-            return mp
-
-        return mapper
+        return _temporal_mapper
@@ -1,13 +1,13 @@
 """ metadata keys for session handling """
+import sys
+
 __all__ = [
     'STRICT_MODE_KEY',
-    'CHANGESET_STACK_KEY',
-    'IS_COMMITTING_KEY',
-    'IS_VCLOCK_UNCHANGED_KEY',
+    'TEMPORAL_METADATA_KEY',
 ]
 
 
-STRICT_MODE_KEY = '__temporal_strict_mode'
-CHANGESET_STACK_KEY = '__temporal_changeset_stack'
-IS_COMMITTING_KEY = '__temporal_is_committing'
-IS_VCLOCK_UNCHANGED_KEY = '__temporal_is_vclock_unchanged'
+# these are used as session.info keys on every flush/commit, so intern them
+# to keep the dict lookups to a pointer compare
+STRICT_MODE_KEY = sys.intern('__temporal_strict_mode')
+TEMPORAL_METADATA_KEY = sys.intern('__temporal_metadata')
@@ -1,19 +1,6 @@
 """Python compatibility helpers."""
 
-# Work around typing.Type existing in >= 3.5.2 but not before
-try:
-    from typing import Type  # pylint: disable=unused-import
-except ImportError:  # pragma: no cover
-    import typing
-
-    CT = typing.TypeVar('CT', covariant=True, bound=type)
-
-    class Type(type, typing.Generic[CT], extra=type):
-        pass
-
-
-# single dispatch is in functools from >=3.4
-try:
-    from functools import singledispatch   # pylint: disable=unused-import
-except ImportError:  # pragma: no cover
-    from singledispatch import singledispatch  # noqa: F401
+# typing.Type and functools.singledispatch are always available on the
+# versions of Python we support (>= 3.5.2), so import them directly
+from functools import singledispatch  # noqa: F401 pylint: disable=unused-import
+from typing import Type  # noqa: F401 pylint: disable=unused-import
@@ -1,4 +1,5 @@
 """ temporal session handling """
+import collections
 import datetime
 import itertools
 import typing
@@ -7,187 +8,319 @@ import warnings
 import sqlalchemy.event as event
 import sqlalchemy.orm as orm
 
-from temporal_sqlalchemy.bases import TemporalOption, Clocked
+from temporal_sqlalchemy.bases import TEMPORAL_CLASS_REGISTRY, TemporalOption, Clocked
 from temporal_sqlalchemy.metadata import (
     STRICT_MODE_KEY,
-    CHANGESET_STACK_KEY,
-    IS_COMMITTING_KEY,
-    IS_VCLOCK_UNCHANGED_KEY,
+    TEMPORAL_METADATA_KEY,
 )
 
 
+# bounded pool of changeset dicts -- short transactions would otherwise
+# allocate and throw away a dict per transaction boundary
+_CHANGESET_POOL = []
+_CHANGESET_POOL_MAX_SIZE = 64
+
+
+class SessionMetadata:
+    """ per-session temporal bookkeeping, stored at session.info[TEMPORAL_METADATA_KEY]
+
+    slot access is a fixed offset load, versus a string hash + dict probe
+    per field on the temporal hot paths """
+    __slots__ = (
+        'changeset_stack',
+        'is_committing',
+        'is_vclock_unchanged',
+    )
+
+    def __init__(self):
+        self.changeset_stack = []
+        self.is_committing = False
+        self.is_vclock_unchanged = True
+
+
+def _acquire_changeset():
+    """ take a changeset dict from the pool, or make a fresh one
+
+    pop-then-handle rather than check-then-pop: the pool is shared between
+    sessions, so another thread may drain it between the two steps """
+    try:
+        return _CHANGESET_POOL.pop()
+    except IndexError:
+        return {}
+
+
+def _release_changeset(changeset):
+    """ return a drained changeset dict to the pool """
+    if len(_CHANGESET_POOL) < _CHANGESET_POOL_MAX_SIZE:
+        changeset.clear()
+        _CHANGESET_POOL.append(changeset)
+
+
+def _end_commit_cycle(metadata: SessionMetadata):
+    """ reset per-commit bookkeeping once a commit's history has been built
+
+    commits that only release a SAVEPOINT never reach the topmost
+    after_transaction_end, so the reset cannot wait until then """
+    metadata.is_committing = False
+    metadata.is_vclock_unchanged = True
+
+
 def get_current_changeset(session):
     """ get the current set of changes in a running flush cycle """
-    stack = session.info[CHANGESET_STACK_KEY]
+    stack = session.info[TEMPORAL_METADATA_KEY].changeset_stack
     assert stack
 
     return stack[-1]
 
 
-def _temporal_models(session: orm.Session) -> typing.Iterable[Clocked]:
-    """ yield all temporal models currently in the session """
-    for obj in session:
-        if isinstance(getattr(obj, 'temporal_options', None), TemporalOption):
-            yield obj
+def _temporal_models(objects: typing.Iterable) -> typing.List[Clocked]:
+    """ list all temporal models in the given collection
+
+    the type-tag probe is the fast path: temporal_map stamps mapped classes
+    with __temporal_tagged__, which is much cheaper than the attribute +
+    isinstance chain kept as a fallback. a list comprehension avoids paying
+    the generator suspend/resume cost per object """
+    return [
+        obj for obj in objects
+        if type(obj).__dict__.get('__temporal_tagged__') or
+        isinstance(getattr(obj, 'temporal_options', None), TemporalOption)
+    ]
 
 
-def _build_history(session, correlate_timestamp):
-    """ add currently changed properties for writing on commit """
+def _build_history(session, metadata, correlate_timestamp):
+    """ add currently changed properties for writing on commit
+
+    returns True if any history was actually recorded """
     # this shouldn't happen, but it might happen, log a warning and investigate
-    if not session.info.get(CHANGESET_STACK_KEY):  # pragma: no cover
+    if not metadata.changeset_stack:  # pragma: no cover
         warnings.warn('changeset_stack is missing but we are in _build_history()')
-        return
+        return False
 
-    changeset = get_current_changeset(session)
-    items = list(changeset.items())
-    changeset.clear()
+    # swap in a fresh top-of-stack dict instead of copying + clearing the
+    # old one -- O(1) rather than O(n)
+    stack = metadata.changeset_stack
+    changeset = stack[-1]
+    stack[-1] = _acquire_changeset()
 
     is_strict_mode = session.info[STRICT_MODE_KEY]
-    is_vclock_unchanged = session.info[IS_VCLOCK_UNCHANGED_KEY]
-    if items and is_strict_mode:
-        assert not is_vclock_unchanged, \
+    if changeset and is_strict_mode:
+        assert not metadata.is_vclock_unchanged, \
             'commit() has triggered for a changed temporalized property without a clock tick'
 
-    for obj, changes in items:
-        obj.temporal_options.record_history_on_commit(obj, changes, session, correlate_timestamp)
+    # group by temporal options (one per class) so each class records its
+    # batch in a single dispatch
+    groups = collections.defaultdict(list)
+    for obj, changes in changeset.values():
+        groups[type(obj).temporal_options].append((obj, changes))
+
+    for options, batch in groups.items():
+        options.record_history_on_commit_bulk(batch, session, correlate_timestamp)
+
+    built_history = bool(changeset)
+    _release_changeset(changeset)
+
+    return built_history
 
 
 def persist_history(session: orm.Session, flush_context, instances):  # pylint: disable=unused-argument
     """ commit history on session.commit  """
-    if any(_temporal_models(session.deleted)):
+    # hooks are bound to orm.Session itself, so gate on temporalization here
+    if not is_temporal_session(session):
+        return
+
+    # no classes have ever been temporalized, so no flush can have
+    # temporal work to do
+    if not TEMPORAL_CLASS_REGISTRY:
+        return
+
+    # probe deletes via the class tag alone -- temporal_map is the only
+    # thing that sets temporal_options, and it always tags the class, so
+    # the per-object attribute + isinstance walk is unnecessary here
+    deleted = session.deleted
+    if deleted and any(
+            getattr(type(obj), '__temporal_tagged__', False) for obj in deleted):
         raise ValueError("Cannot delete temporal objects.")
 
+    # single pass over the changed rows: bucket them by persistence policy
+    # so each policy runs as a tight branch-free loop below
+    on_commit = []
+    immediate = []
+    for obj in _temporal_models(itertools.chain(session.dirty, session.new)):
+        # temporal_options always lives on the class; going through the type
+        # skips a guaranteed instance-dict miss per object
+        options = type(obj).temporal_options
+        if options.allow_persist_on_commit:
+            on_commit.append((obj, options))
+        else:
+            immediate.append((obj, options))
+
+    # fast path: nothing temporal changed in this flush and nothing is
+    # pending from earlier flushes, so skip the bookkeeping entirely
+    metadata = session.info.get(TEMPORAL_METADATA_KEY)
+    has_pending_changes = bool(
+        metadata and metadata.changeset_stack and metadata.changeset_stack[-1])
+    if not (on_commit or immediate or has_pending_changes):
+        # this can still be a commit's final flush (e.g. only non-temporal
+        # rows changed) -- the cycle has to end here too, or the leaked flag
+        # makes a later plain flush build history prematurely
+        if metadata is not None and metadata.is_committing:
+            _end_commit_cycle(metadata)
+
+        return
+
     # its possible the temporal session was initialized after the transaction has started
-    _initialize_metadata(session)
+    metadata = _initialize_metadata(session)
 
+    # every history row written within this flush shares one timestamp, but
+    # each flush reads the clock anew: reusing a timestamp across flushes
+    # would make _cap_previous_history_row write empty effective ranges when
+    # several commits run inside one outer transaction
     correlate_timestamp = datetime.datetime.now(tz=datetime.timezone.utc)
-    changed_rows = _temporal_models(itertools.chain(session.dirty, session.new))
 
-    changeset = get_current_changeset(session)
-    for obj in changed_rows:
-        if obj.temporal_options.allow_persist_on_commit:
-            new_changes, is_vclock_unchanged = obj.temporal_options.get_history(obj)
+    if on_commit:
+        changeset = metadata.changeset_stack[-1]
+        is_vclock_unchanged = metadata.is_vclock_unchanged
+        for obj, options in on_commit:
+            new_changes, obj_vclock_unchanged = options.get_history(obj)
 
             if new_changes:
-                if obj not in changeset:
-                    changeset[obj] = {}
+                # key the changeset by id() -- hashing a raw pointer beats
+                # hashing a mapped instance, and the stored reference keeps
+                # the object alive for the life of the changeset
+                entry = changeset.get(id(obj))
+                if entry is None:
+                    entry = changeset[id(obj)] = (obj, {})
 
-                old_changes = changeset[obj]
-                old_changes.update(new_changes)
+                entry[1].update(new_changes)
 
-            session.info[IS_VCLOCK_UNCHANGED_KEY] = session.info[IS_VCLOCK_UNCHANGED_KEY] and is_vclock_unchanged
-        else:
-            obj.temporal_options.record_history(obj, session, correlate_timestamp)
+            is_vclock_unchanged = is_vclock_unchanged and obj_vclock_unchanged
+
+        metadata.is_vclock_unchanged = is_vclock_unchanged
+
+    for obj, options in immediate:
+        options.record_history(obj, session, correlate_timestamp)
 
     # if this is the last flush, build all the history
-    if session.info[IS_COMMITTING_KEY]:
-        _build_history(session, correlate_timestamp)
+    if metadata.is_committing:
+        _build_history(session, metadata, correlate_timestamp)
 
-        session.info[IS_COMMITTING_KEY] = False
+        _end_commit_cycle(metadata)
 
 
 def enable_is_committing_flag(session):
     """before_commit happens before before_flush, and we need to make sure the history gets built
-    during the final one of these two events, so we need to use the gross IS_COMMITTING_KEY flag to
+    during the final one of these two events, so we need to use the gross is_committing flag to
     control this behavior"""
-    session.info[IS_COMMITTING_KEY] = True
+    if not is_temporal_session(session):
+        return
+
+    metadata = _initialize_metadata(session)
+    metadata.is_committing = True
 
     # if the session is clean, a final flush won't happen, so try to build the history now
     if session._is_clean():  # pylint: disable=protected-access
         correlate_timestamp = datetime.datetime.now(tz=datetime.timezone.utc)
-        _build_history(session, correlate_timestamp)
+        built_history = _build_history(session, metadata, correlate_timestamp)
 
-    # building the history can cause the session to be dirtied, which will in turn call another
-    # flush(), so we want to check this before reseting
-    # if there are more changes, flush will build them itself
-    if session._is_clean():  # pylint: disable=protected-access
-        session.info[IS_COMMITTING_KEY] = False
-
-
-def _get_transaction_stack_depth(transaction):
-    """ build history stack by transaction depth """
-    depth = 0
+        # building the history can cause the session to be dirtied, which will in turn call
+        # another flush(), so we need to re-check cleanliness -- but only when history was
+        # actually built; otherwise the first scan still holds
+        # if there are more changes, flush will build them itself
+        if not built_history or session._is_clean():  # pylint: disable=protected-access
+            _end_commit_cycle(metadata)
 
-    current = transaction
-    while current:
-        depth += 1
-        current = transaction.parent
 
-    return depth
-
-
-def _initialize_metadata(session):
+def _initialize_metadata(session) -> SessionMetadata:
     """ prepare a session for temporal book keeping """
-    if CHANGESET_STACK_KEY not in session.info:
-        session.info[CHANGESET_STACK_KEY] = []
-
-    if IS_COMMITTING_KEY not in session.info:
-        session.info[IS_COMMITTING_KEY] = False
+    metadata = session.info.get(TEMPORAL_METADATA_KEY)
+    if metadata is None:
+        metadata = session.info[TEMPORAL_METADATA_KEY] = SessionMetadata()
 
-    if IS_VCLOCK_UNCHANGED_KEY not in session.info:
-        session.info[IS_VCLOCK_UNCHANGED_KEY] = True
+    # sometimes temporalize a session after a transaction has already been open; sqlalchemy
+    # offers no replay of transaction-create events for transactions that already exist, so
+    # backfill one stack entry per live (nested) transaction
+    if not metadata.changeset_stack:
+        transaction = session.transaction
+        while transaction:
+            metadata.changeset_stack.append(_acquire_changeset())
+            transaction = transaction.parent
 
-    # sometimes temporalize a session after a transaction has already been open, so we need to
-    # backfill any missing stack entries
-    if not session.info[CHANGESET_STACK_KEY]:
-        depth = _get_transaction_stack_depth(session.transaction)
-        for _ in range(depth):
-            session.info[CHANGESET_STACK_KEY].append({})
+    return metadata
 
 
 def start_transaction(session, transaction):  # pylint: disable=unused-argument
     """ handle nested transaction starting """
-    _initialize_metadata(session)
+    if not is_temporal_session(session):
+        return
+
+    metadata = _initialize_metadata(session)
 
-    session.info[CHANGESET_STACK_KEY].append({})
+    metadata.changeset_stack.append(_acquire_changeset())
 
 
 def end_transaction(session, transaction):
     """ end nested transaction handler """
+    if not is_temporal_session(session):
+        return
+
+    metadata = session.info.get(TEMPORAL_METADATA_KEY)
+
     # there are some edge cases where no temporal changes actually happen, so don't bother
-    if not session.info.get(CHANGESET_STACK_KEY):
+    if not metadata or not metadata.changeset_stack:
         return
 
-    session.info[CHANGESET_STACK_KEY].pop()
+    _release_changeset(metadata.changeset_stack.pop())
 
     # reset bookkeeping fields if we're ending a top most transaction
     if transaction.parent is None:
-        session.info[IS_VCLOCK_UNCHANGED_KEY] = True
-        session.info[IS_COMMITTING_KEY] = False
+        metadata.is_vclock_unchanged = True
+        metadata.is_committing = False
 
         # there should be no more changeset stacks at this point, otherwise there is a mismatch
-        assert not session.info[CHANGESET_STACK_KEY]
+        assert not metadata.changeset_stack
 
 
-def temporal_session(session: typing.Union[orm.Session, orm.sessionmaker], strict_mode=False) -> orm.Session:
+def temporal_session(session: typing.Union[orm.Session, orm.sessionmaker],
+                     strict_mode=False,
+                     expire_on_commit=None) -> orm.Session:
     """
     Setup the session to track changes via temporal
 
     :param session: SQLAlchemy ORM session to temporalize
     :param strict_mode: if True, will raise exceptions when improper flush() calls are made (default is False)
+    :param expire_on_commit: if not None, override the session's expire_on_commit setting.
+        Passing False avoids a reload SELECT per touched row on the first access after every
+        commit (default is None, leaving the session's setting alone)
     :return: temporalized SQLALchemy ORM session
     """
-    # defer listening to the flush hook until after we update the metadata
-    install_flush_hook = not is_temporal_session(session)
-
     if isinstance(session, orm.Session):
         session.info[STRICT_MODE_KEY] = strict_mode
+        if expire_on_commit is not None:
+            session.expire_on_commit = expire_on_commit
     elif isinstance(session, orm.sessionmaker):  # pragma: no cover
-        session.configure(info={STRICT_MODE_KEY: strict_mode})
+        if expire_on_commit is not None:
+            session.configure(info={STRICT_MODE_KEY: strict_mode},
+                              expire_on_commit=expire_on_commit)
+        else:
+            session.configure(info={STRICT_MODE_KEY: strict_mode})
     else:  # pragma: no cover
         raise ValueError('Invalid session')
 
-    if install_flush_hook:
-        event.listen(session, 'before_flush', persist_history)
-        event.listen(session, 'before_commit', enable_is_committing_flag)
-
-        # nested transaction handling
-        event.listen(session, 'after_transaction_create', start_transaction)
-        event.listen(session, 'after_transaction_end', end_transaction)
-
     return session
 
 
 def is_temporal_session(session: orm.Session) -> bool:
     """ checks if a given session is a real session and is temporal """
     return isinstance(session, orm.Session) and session.info.get(STRICT_MODE_KEY) is not None
+
+
+# bind the hooks once to the Session class itself; each hook bails out
+# immediately for sessions that were never temporalized, which makes
+# temporal_session() a plain session.info update instead of four
+# event.listen registrations per session
+event.listen(orm.Session, 'before_flush', persist_history)
+event.listen(orm.Session, 'before_commit', enable_is_committing_flag)
+
+# nested transaction handling
+event.listen(orm.Session, 'after_transaction_create', start_transaction)
+event.listen(orm.Session, 'after_transaction_end', end_transaction)
@@ -1,4 +1,8 @@
 """ pytest fixtures for test suite """
+import atexit
+import os
+import tempfile
+
 import pytest
 import sqlalchemy as sa
 import sqlalchemy.orm as orm
@@ -8,12 +12,89 @@ import temporal_sqlalchemy as temporal
 from . import models
 
 
-@pytest.yield_fixture(scope='session')
+# the test cluster is throwaway, so trade all durability for speed: no
+# fsync/WAL sync on commit, no full page writes, and no autovacuum churn
+# during the short-lived suite
+POSTGRES_ARGS = (
+    '-h 127.0.0.1 -F '
+    '-c fsync=off '
+    '-c synchronous_commit=off '
+    '-c full_page_writes=off '
+    '-c checkpoint_timeout=30min '
+    '-c autovacuum=off '
+    '-c bgwriter_lru_maxpages=0'
+)
+
+
+def _bootstrap_database(postgresql):
+    """ per-cluster setup: extensions + schemas, cached with the cluster """
+    engine_ = sa.create_engine(postgresql.url())
+    try:
+        conn = engine_.connect()
+        # one round-trip for all of the bootstrap DDL
+        conn.execute(
+            'CREATE EXTENSION IF NOT EXISTS "btree_gist" WITH SCHEMA pg_catalog;'
+            'CREATE SCHEMA IF NOT EXISTS %s;'
+            'CREATE SCHEMA IF NOT EXISTS %s;' % (models.SCHEMA, models.TEMPORAL_SCHEMA))
+
+        # bake the model tables into the cached cluster too: every copy then
+        # starts with the schema already in place, template-database style,
+        # instead of replaying the full create_all DDL burst per session
+        with conn.begin():
+            models.basic_metadata.create_all(conn, checkfirst=False)
+
+        conn.close()
+    finally:
+        engine_.dispose()
+
+
+# initdb + extension/schema bootstrap run once per factory; later engine
+# fixtures only start postgres from the cached data directory. built lazily
+# so importing this module (e.g. collecting non-database tests) doesn't
+# require a postgres install
+_postgresql_factory = None
+
+# the cluster directories are all throwaway, so let testing.postgresql's
+# per-instance mkdtemp() land on tmpfs when the host has one. each instance
+# must keep its own directory -- handing the factory a shared base_dir would
+# make every copy's data directory collide with the cached template it is
+# copied from
+if os.path.isdir('/dev/shm'):
+    tempfile.tempdir = '/dev/shm'
+
+
+def _get_postgresql_factory():
+    global _postgresql_factory  # pylint: disable=global-statement
+    if _postgresql_factory is None:
+        _postgresql_factory = testing.postgresql.PostgresqlFactory(
+            cache_initialized_db=True,
+            postgres_args=POSTGRES_ARGS,
+            on_initialized=_bootstrap_database)
+        atexit.register(_postgresql_factory.clear_cache)
+
+    return _postgresql_factory
+
+
+def _database_url(db):
+    """ prefer the cluster's UNIX socket over TCP loopback when present --
+    same-host queries then skip the TCP stack entirely """
+    socket_dir = os.path.join(db.base_dir, 'tmp')
+    if os.path.isdir(socket_dir):
+        dsn = db.dsn()
+        return 'postgresql+psycopg2://%s@/%s?host=%s&port=%s' % (
+            dsn['user'], dsn['database'], socket_dir, dsn['port'])
+
+    return db.url()
+
+
+@pytest.fixture(scope='session')
 def engine():
     """Creates a postgres database for testing, returns a sqlalchemy engine"""
-    db = testing.postgresql.Postgresql()
+    db = _get_postgresql_factory()()
 
-    engine_ = sa.create_engine(db.url())
+    # the whole suite runs on the single long-lived connection below, so a
+    # QueuePool would only add checkout/checkin locking overhead
+    engine_ = sa.create_engine(_database_url(db), poolclass=sa.pool.NullPool)
 
     yield engine_
 
@@ -21,43 +102,56 @@ def engine():
     db.stop()
 
 
-@pytest.yield_fixture(scope='session')
+@pytest.fixture(scope='session')
 def connection(engine):  # pylint: disable=redefined-outer-name
     """Session-wide test database."""
+    # no DDL here -- the tables are part of the cached cluster snapshot
+    # built by _bootstrap_database
     conn = engine.connect()
-    for extension in ['uuid-ossp', 'btree_gist']:
-        conn.execute("""\
-            CREATE EXTENSION IF NOT EXISTS "%s"
-            WITH SCHEMA pg_catalog
-        """ % extension)
-
-    for schema in [models.SCHEMA, models.TEMPORAL_SCHEMA]:
-        conn.execute('CREATE SCHEMA IF NOT EXISTS ' + schema)
 
-    models.basic_metadata.create_all(conn)
+    # one outer transaction for the whole run; tests stack SAVEPOINTs on it,
+    # so each test pays SAVEPOINT/ROLLBACK TO instead of BEGIN/ROLLBACK
+    outer = conn.begin()
 
     yield conn
 
+    outer.rollback()
     conn.close()
 
 
-@pytest.yield_fixture(scope="session")
-def sessionmaker():
-    """ yields a temporalized sessionmaker -- per test session """
-    Session = orm.sessionmaker()
+@pytest.fixture(scope='session')
+def sessionmaker(connection):  # pylint: disable=redefined-outer-name
+    """ yields a temporalized sessionmaker bound to the shared connection """
+    # the savepoint-restart listener in the session fixture already expires
+    # all state after every commit, so the default commit-time expiration
+    # would only schedule redundant reload SELECTs
+    Session = orm.sessionmaker(bind=connection, expire_on_commit=False)
 
-    yield temporal.temporal_session(Session)
+    # configure all mappers up front instead of lazily on the first query,
+    # keeping that one-off cost out of whichever test happens to run first
+    orm.configure_mappers()
 
-    Session.close_all()
+    yield temporal.temporal_session(Session)
 
 
-@pytest.yield_fixture()
+@pytest.fixture()
 def session(connection: sa.engine.Connection, sessionmaker: orm.sessionmaker):  # pylint: disable=redefined-outer-name
-    """ yields temporalized session -- per test """
-    transaction = connection.begin()
-    sess = sessionmaker(bind=connection)
+    """ yields temporalized session -- per test, isolated via SAVEPOINT
+
+    test-level commit() only releases a SAVEPOINT, so per-test cleanup is a
+    single savepoint rollback instead of re-creating state """
+    transaction = connection.begin_nested()
+    sess = sessionmaker()
+    sess.begin_nested()
+
+    @sa.event.listens_for(sess, 'after_transaction_end')
+    def restart_savepoint(session_, trans):  # pylint: disable=unused-variable
+        # whenever a test commits or rolls back the savepoint, open a new one
+        if trans.nested and not trans._parent.nested:  # pylint: disable=protected-access
+            session_.expire_all()
+            session_.begin_nested()
 
     yield sess
 
-    transaction.rollback()
     sess.close()
+    transaction.rollback()
@@ -1,5 +1,7 @@
 # pylint: disable=missing-docstring, no-self-use
 import datetime
+import functools
+import uuid
 
 import sqlalchemy as sa
 import sqlalchemy.ext.mutable as mutable
@@ -22,19 +24,25 @@ ExpectedFailBase = sa_decl.declarative_base(metadata=expected_fail_metadata)
 AbstractConcreteBase = sa_decl.AbstractConcreteBase
 
 
+# the prop_a..prop_f layout is shared by several models; pre-applying the
+# decorator keeps the repeated arg tuple in one place
+_SIX_PROPS = ('prop_a', 'prop_b', 'prop_c', 'prop_d', 'prop_e', 'prop_f')
+clock_six = functools.partial(temporal_sqlalchemy.add_clock, *_SIX_PROPS,
+                              temporal_schema=TEMPORAL_SCHEMA)
+
+
 def auto_uuid():
-    uuid_gen_expr = sa.text('uuid_generate_v4()')
+    # client-side default: inserts don't need a round-trip (or the uuid-ossp
+    # extension) to learn their own primary key
     return sa.Column(sap.UUID(as_uuid=True),
-                     primary_key=True, server_default=uuid_gen_expr)
+                     primary_key=True, default=uuid.uuid4)
 
 
 def utcnow() -> datetime.datetime:
     return datetime.datetime.now(datetime.timezone.utc)
 
 
-@temporal_sqlalchemy.add_clock(
-    'prop_a', 'prop_b', 'prop_c', 'prop_d', 'prop_e', 'prop_f',
-    temporal_schema=TEMPORAL_SCHEMA)
+@clock_six()
 class SimpleTableTemporal(temporal_sqlalchemy.Clocked, Base):
     __tablename__ = 'simple_table_temporal'
     __table_args__ = {'schema': SCHEMA}
@@ -43,7 +51,7 @@ class SimpleTableTemporal(temporal_sqlalchemy.Clocked, Base):
     prop_a = sa.Column(sa.Integer)
     prop_b = sa.Column(sap.TEXT)
     prop_c = sa.Column(sa.DateTime(True))
-    prop_d = sa.Column(mutable.MutableDict.as_mutable(sap.JSON))
+    prop_d = sa.Column(mutable.MutableDict.as_mutable(sap.JSONB))
     prop_e = sa.Column(sap.DATERANGE)
     prop_f = sa.Column(sap.ARRAY(sap.TEXT))
 
@@ -57,9 +65,7 @@ class SimpleAbstractConcreteBaseTable(AbstractConcreteBase):
     prop_b = sa.Column(sap.TEXT)
 
 
-@temporal_sqlalchemy.add_clock(
-    'prop_a', 'prop_b', 'prop_c', 'prop_d', 'prop_e', 'prop_f',
-    temporal_schema=TEMPORAL_SCHEMA)
+@clock_six()
 class SimpleConcreteChildTemporalTable(
         temporal_sqlalchemy.Clocked, SimpleAbstractConcreteBaseTable, Base):
     __tablename__ = 'simple_concrete_child_a_temporal'
@@ -67,7 +73,7 @@ class SimpleConcreteChildTemporalTable(
 
     id = auto_uuid()
     prop_c = sa.Column(sa.DateTime(True))
-    prop_d = sa.Column(mutable.MutableDict.as_mutable(sap.JSON))
+    prop_d = sa.Column(mutable.MutableDict.as_mutable(sap.JSONB))
     prop_e = sa.Column(sap.DATERANGE)
     prop_f = sa.Column(sap.ARRAY(sap.TEXT))
 
@@ -97,17 +103,28 @@ class RelatedTable(Base):
     prop_a = sa.Column(sa.Integer)
 
 
+class RelMixin:
+    """ shared rel_id/rel mapping to RelatedTable -- declared once so the
+    mapper only has to work out the join condition once """
+
+    @sa_decl.declared_attr
+    def rel_id(cls):  # pylint: disable=no-self-argument
+        return sa.Column(sa.ForeignKey(RelatedTable.id))
+
+    @sa_decl.declared_attr
+    def rel(cls):  # pylint: disable=no-self-argument
+        return orm.relationship(RelatedTable)
+
+
 @temporal_sqlalchemy.add_clock(
     'prop_a', 'prop_b', 'rel_id', 'rel', temporal_schema=TEMPORAL_SCHEMA)
-class RelationalTemporalModel(temporal_sqlalchemy.Clocked, Base):
+class RelationalTemporalModel(temporal_sqlalchemy.Clocked, RelMixin, Base):
     __tablename__ = 'relational_temporal'
     __table_args__ = {'schema': SCHEMA}
 
     id = auto_uuid()
     prop_a = sa.Column(sa.Integer)
     prop_b = sa.Column(sap.TEXT)
-    rel_id = sa.Column(sa.ForeignKey(RelatedTable.id))
-    rel = orm.relationship(RelatedTable)
 
 
 class Activity(temporal_sqlalchemy.TemporalActivityMixin, Base):
@@ -141,15 +158,13 @@ class SecondTemporalWithActivity(temporal_sqlalchemy.Clocked, Base):
     column = sa.Column(sa.Integer)
 
 
-class SimpleTable(Base):
+class SimpleTable(RelMixin, Base):
     __tablename__ = 'simple_table'
     __table_args__ = {'schema': SCHEMA}
 
     id = auto_uuid()
     prop_a = sa.Column(sa.Integer)
     prop_b = sa.Column(sap.TEXT)
-    rel_id = sa.Column(sa.ForeignKey(RelatedTable.id))
-    rel = orm.relationship(RelatedTable)
 
 
 REALLY_REALLY = 'really_' * 5
@@ -221,7 +236,8 @@ class NewStyleModel(Base, temporal_sqlalchemy.TemporalModel):
         schema = TEMPORAL_SCHEMA
 
 
-class NewStyleModelWithRelationship(Base, temporal_sqlalchemy.TemporalModel):
+class NewStyleModelWithRelationship(RelMixin, Base,
+                                    temporal_sqlalchemy.TemporalModel):
     __tablename__ = 'new_style_temporal_model_with_relationship'
     __table_args__ = {'schema': SCHEMA}
 
@@ -231,8 +247,6 @@ class NewStyleModelWithRelationship(Base, temporal_sqlalchemy.TemporalModel):
     int_prop = sa.Column(sa.Integer)
     bool_prop = sa.Column(sa.Boolean)
     datetime_prop = sa.Column(sa.DateTime(True))
-    rel_id = sa.Column(sa.ForeignKey(RelatedTable.id))
-    rel = orm.relationship(RelatedTable)
 
     class Temporal:
         activity_class = Activity
@@ -254,25 +268,20 @@ class PersistenceStrategy(temporal_sqlalchemy.Clocked, Base):
     prop_a = sa.Column(sa.Integer)
     prop_b = sa.Column(sap.TEXT)
     prop_c = sa.Column(sa.DateTime(True))
-    prop_d = sa.Column(mutable.MutableDict.as_mutable(sap.JSON))
+    # never mutated in place by the persistence tests, so skip the Mutable
+    # extension's per-set listeners and coerce wrapper
+    prop_d = sa.Column(sap.JSONB)
     prop_e = sa.Column(sap.DATERANGE)
     prop_f = sa.Column(sap.ARRAY(sap.TEXT))
 
 
-@temporal_sqlalchemy.add_clock(
-    'prop_a', 'prop_b', 'prop_c', 'prop_d', 'prop_e', 'prop_f',
-    temporal_schema=TEMPORAL_SCHEMA,
-    activity_cls=Activity)
+@clock_six(activity_cls=Activity)
 class PersistOnFlushTable(PersistenceStrategy):
     __tablename__ = 'persist_on_flush_table'
     __table_args__ = {'schema': SCHEMA}
 
 
-@temporal_sqlalchemy.add_clock(
-    'prop_a', 'prop_b', 'prop_c', 'prop_d', 'prop_e', 'prop_f',
-    temporal_schema=TEMPORAL_SCHEMA,
-    activity_cls=Activity,
-    allow_persist_on_commit=True)
+@clock_six(activity_cls=Activity, allow_persist_on_commit=True)
 class PersistOnCommitTable(PersistenceStrategy):
     __tablename__ = 'persist_on_commit_table'
     __table_args__ = {'schema': SCHEMA}
@@ -1,18 +1,77 @@
 # pylint: disable=missing-docstring
 import pytest
+import sqlalchemy as sa
+
+import temporal_sqlalchemy as temporal
 
 from . import models
 
 
-class DatabaseTest:
+def history_models_for(model, *attrs):
+    return {
+        attr: temporal.get_history_model(getattr(model, attr))
+        for attr in attrs
+    }
+
+
+def first_history_row(session, history_model, attr):
+    """ fetch one history row's (attr value, vclock) pair with a Core
+    select -- no ORM hydration for rows the tests read two fields from """
+    table = history_model.__table__
+    return session.execute(
+        sa.select([table.c[attr], table.c.vclock]).limit(1)).first()
+
+
+def history_counts(session, history_models):
+    """ fetch COUNT(*) for several history tables in one round-trip """
+    return dict(session.execute(sa.union_all(*[
+        sa.select([sa.literal(attr).label('attr'),
+                   sa.func.count().label('count')])
+        .select_from(history.__table__)
+        for attr, history in history_models.items()
+    ])).fetchall())
+
+
+class ConnectionTest:
+    """ base for tests that need the database but never open an ORM session,
+    so they skip the per-test SAVEPOINT begin/rollback entirely """
 
     engine = None
     connection = None
 
-    @pytest.fixture(autouse=True)
-    def setup(self, engine, session):
-        self.engine = engine
-        self.connection = session.bind
+    # table names per schema, fetched once per schema for the whole run --
+    # the suite only ever creates tables up front, so the listing is stable
+    _tables_by_schema = {}
+
+    @pytest.fixture(scope='class', autouse=True)
+    def setup(self, request, engine, connection):
+        # engine and connection are session scoped, so bind them once per
+        # class instead of re-assigning on every test's instance
+        request.cls.engine = engine
+        request.cls.connection = connection
+
+    def existing_tables(self, conn, schema=models.TEMPORAL_SCHEMA):
+        """ every table name in the given schema, one round-trip per schema """
+        try:
+            return self._tables_by_schema[schema]
+        except KeyError:
+            names = frozenset(name for name, in conn.execute(
+                sa.text('SELECT table_name FROM information_schema.tables '
+                        'WHERE table_schema = :schema'), schema=schema))
+            self._tables_by_schema[schema] = names
+            return names
 
     def has_table(self, conn, name, schema=models.TEMPORAL_SCHEMA):
-        return self.engine.dialect.has_table(conn, name, schema)
+        return name in self.existing_tables(conn, schema)
+
+
+class DatabaseTest(ConnectionTest):
+    """ base for tests that work through a temporalized ORM session """
+
+    session = None
+
+    @pytest.fixture(autouse=True)
+    def setup_session(self, session):
+        # only the session itself is per test; engine/connection binding is
+        # inherited from the class-scoped ConnectionTest.setup
+        self.session = session
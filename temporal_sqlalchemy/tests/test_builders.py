@@ -12,6 +12,10 @@ from temporal_sqlalchemy.clock import (
 
 from . import models
 
+# one metadata for all of the bare parametrize tables below -- MetaData
+# instances are not free, and the cases only need distinct table names
+BARE_META = sa.MetaData()
+
 
 def test_build_history_table():
     rel_id_prop = sa.inspect(models.RelationalTemporalModel.rel_id).property
@@ -69,7 +73,7 @@ def test_build_clock_class():
     (
         sa.Table(
             'bare_table_single_pk_no_activity',
-            sa.MetaData(),
+            BARE_META,
             sa.Column('id', sa.Integer, primary_key=True),
             sa.Column('description', sa.Text),
             schema='bare_table_test_schema',
@@ -81,7 +85,7 @@ def test_build_clock_class():
     (
         sa.Table(
             'bare_table_compositve_pk_no_activity',
-            sa.MetaData(),
+            BARE_META,
             sa.Column('num_id', sa.Integer, primary_key=True),
             sa.Column('text_id', sa.Text, primary_key=True),
             sa.Column('description', sa.Text),
@@ -94,7 +98,7 @@ def test_build_clock_class():
     (
         sa.Table(
             'bare_table_single_pk_with_activity',
-            sa.MetaData(),
+            BARE_META,
             sa.Column('id', sa.Integer, primary_key=True),
             sa.Column('description', sa.Text),
             schema='bare_table_test_schema',
@@ -106,7 +110,7 @@ def test_build_clock_class():
     (
         sa.Table(
             'bare_table_compositve_pk_with_activity',
-            sa.MetaData(),
+            BARE_META,
             sa.Column('num_id', sa.Integer, primary_key=True),
             sa.Column('text_id', sa.Text, primary_key=True),
             sa.Column('description', sa.Text),
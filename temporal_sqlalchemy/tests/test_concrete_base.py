@@ -9,6 +9,18 @@ import temporal_sqlalchemy as temporal
 from . import shared, models
 
 
+# resolved once at import -- these lookups are pure metadata and identical
+# for every test in this module
+SIMPLE_CHILD_HISTORY_MODELS = shared.history_models_for(
+    models.SimpleConcreteChildTemporalTable, 'prop_a', 'prop_b', 'prop_c')
+SIMPLE_CHILD_HISTORY_MODEL_LIST = tuple(
+    models.SimpleConcreteChildTemporalTable
+    .temporal_options.history_models.values())
+DEFAULT_TABLE_HISTORY_MODELS = shared.history_models_for(
+    models.TemporalTableWithDefault,
+    'prop_a', 'prop_b', 'prop_default', 'prop_callable', 'prop_func')
+
+
 class TestTemporalConcreteBaseModels(shared.DatabaseTest):
     def test_temporal_options_class(self):
         options = models.SimpleConcreteChildTemporalTable.temporal_options
@@ -32,14 +44,13 @@ class TestTemporalConcreteBaseModels(shared.DatabaseTest):
 
     def test_creates_clock_table(self):
         table_name = models.SimpleConcreteChildTemporalTable.__table__.name
-        assert self.has_table(self.connection, table_name, schema=models.SCHEMA)
-        assert self.has_table(self.connection, '%s_clock' % table_name)
-        assert self.has_table(self.connection, '%s_history_prop_a' % table_name)
-        assert self.has_table(self.connection, '%s_history_prop_b' % table_name)
-        assert self.has_table(self.connection, '%s_history_prop_c' % table_name)
-        assert self.has_table(self.connection, '%s_history_prop_d' % table_name)
-        assert self.has_table(self.connection, '%s_history_prop_e' % table_name)
-        assert self.has_table(self.connection, '%s_history_prop_f' % table_name)
+        entity_tables = self.existing_tables(self.connection, models.SCHEMA)
+        temporal_tables = self.existing_tables(self.connection)
+
+        assert table_name in entity_tables
+        assert '%s_clock' % table_name in temporal_tables
+        assert {'%s_history_prop_%s' % (table_name, prop)
+                for prop in 'abcdef'} <= temporal_tables
 
     def test_init_adds_clock_tick(self, session):
         clock_query = session.query(
@@ -68,24 +79,15 @@ class TestTemporalConcreteBaseModels(shared.DatabaseTest):
 
         clock = clock_query.first()
 
-        prop_a_history_model = temporal.get_history_model(
-            models.SimpleConcreteChildTemporalTable.prop_a)
-        prop_b_history_model = temporal.get_history_model(
-            models.SimpleConcreteChildTemporalTable.prop_b)
-        prop_c_history_model = temporal.get_history_model(
-            models.SimpleConcreteChildTemporalTable.prop_c)
-
-        for attr, history_table in [
-                ('prop_a', prop_a_history_model),
-                ('prop_b', prop_b_history_model),
-                ('prop_c', prop_c_history_model),
-                ]:
-            clock_query = session.query(history_table).count()
-            assert clock_query == 1, "missing entry for %r" % history_table
-
-            history = session.query(history_table).first()
-            assert clock.tick in history.vclock
-            assert getattr(history, attr) == getattr(t, attr)
+        history_counts = shared.history_counts(session, SIMPLE_CHILD_HISTORY_MODELS)
+        for attr, history_table in SIMPLE_CHILD_HISTORY_MODELS.items():
+            assert history_counts[attr] == 1, \
+                "missing entry for %r" % history_table
+
+            value, vclock = shared.first_history_row(
+                session, history_table, attr)
+            assert clock.tick in vclock
+            assert value == getattr(t, attr)
 
     def test_clock_tick_editing(self, session):
         clock_model = models.SimpleConcreteChildTemporalTable \
@@ -116,31 +118,22 @@ class TestTemporalConcreteBaseModels(shared.DatabaseTest):
         session.commit()
 
         t = session.query(models.SimpleConcreteChildTemporalTable).first()
-        clock_query = session.query(clock_model)
-        assert clock_query.count() == 2
+        clocks = session.query(clock_model).order_by(clock_model.tick).all()
+        assert len(clocks) == 2
 
-        create_clock = clock_query.first()
-        update_clock = clock_query.order_by(
-            clock_model.timestamp.desc()).first()
+        create_clock, update_clock = clocks
         assert create_clock.timestamp == t.date_created
         assert update_clock.timestamp == t.date_modified
 
         assert t.vclock == 2
         assert t.clock.count() == 2
 
-        clock = clock_query.order_by(
-            models.SimpleConcreteChildTemporalTable
-            .temporal_options.clock_model.tick.desc(),
-        ).first()
-        for history_table in (
-                models.SimpleConcreteChildTemporalTable
-                .temporal_options.history_models.values()):
-            clock_query = session.query(history_table).count()
-            assert clock_query == 2
-
-            history = session.query(history_table) \
-                .order_by(history_table.vclock.desc()).first()
-            assert clock.tick in history.vclock
+        clock = update_clock
+        for history_table in SIMPLE_CHILD_HISTORY_MODEL_LIST:
+            history_rows = session.query(history_table) \
+                .order_by(history_table.vclock).all()
+            assert len(history_rows) == 2
+            assert clock.tick in history_rows[-1].vclock
 
     def test_clock_table_has_no_activity_columns(self):
         assert (
@@ -168,59 +161,48 @@ class TestTemporalConcreteBaseModels(shared.DatabaseTest):
         assert isinstance(t.prop_func, datetime.datetime)
 
         clock = clock_query.first()
-        history_tables = {
-            'prop_func': temporal.get_history_model(
-                models.TemporalTableWithDefault.prop_func),
-            'prop_callable': temporal.get_history_model(
-                models.TemporalTableWithDefault.prop_callable),
-            'prop_default': temporal.get_history_model(
-                models.TemporalTableWithDefault.prop_default),
-            'prop_a': temporal.get_history_model(
-                models.TemporalTableWithDefault.prop_a),
-            'prop_b': temporal.get_history_model(
-                models.TemporalTableWithDefault.prop_b),
-        }
-        for attr, history in history_tables.items():
-            clock_query = session.query(history)
-            assert clock_query.count() == 1, \
+
+        # one round-trip for all of the per-history-table counts
+        history_counts = shared.history_counts(session, DEFAULT_TABLE_HISTORY_MODELS)
+        for attr, history in DEFAULT_TABLE_HISTORY_MODELS.items():
+            assert history_counts[attr] == 1, \
                 "%r missing a history entry for initial value" % history
 
-            recorded_history = clock_query.first()
-            assert clock.tick in recorded_history.vclock
-            assert getattr(t, attr) == getattr(recorded_history, attr)
+            value, vclock = shared.first_history_row(session, history, attr)
+            assert clock.tick in vclock
+            assert getattr(t, attr) == value
 
     def test_multiple_edits(self, session):
         history_models = {
-            'prop_a': temporal.get_history_model(
-                models.SimpleConcreteChildTemporalTable.prop_a),
-            'prop_b': temporal.get_history_model(
-                models.SimpleConcreteChildTemporalTable.prop_b),
+            attr: SIMPLE_CHILD_HISTORY_MODELS[attr]
+            for attr in ('prop_a', 'prop_b')
         }
 
         t = models.SimpleConcreteChildTemporalTable(prop_a=1, prop_b='foo')
         session.add(t)
         session.commit()
 
+        history_counts = shared.history_counts(session, history_models)
         for attr, history in history_models.items():
-            clock_query = session.query(history)
-            assert clock_query.count() == 1, \
+            assert history_counts[attr] == 1, \
                 "%r missing a history entry for initial value" % history
 
-            recorded_history = clock_query.first()
-            assert 1 in recorded_history.vclock
-            assert getattr(t, attr) == getattr(recorded_history, attr)
+            value, vclock = shared.first_history_row(session, history, attr)
+            assert 1 in vclock
+            assert getattr(t, attr) == value
 
         with t.clock_tick():
             t.prop_a = 2
             t.prop_b = 'bar'
         session.commit()
 
+        history_counts = shared.history_counts(session, history_models)
         for attr, history in history_models.items():
-            clock_query = session.query(history)
-            assert clock_query.count() == 2, \
+            assert history_counts[attr] == 2, \
                 "%r missing a history entry for initial value" % history
 
-            recorded_history = clock_query[-1]
+            recorded_history = session.query(history).order_by(
+                history.vclock.desc()).first()
             assert 2 in recorded_history.vclock
             assert getattr(t, attr) == getattr(recorded_history, attr)
 
@@ -229,24 +211,18 @@ class TestTemporalConcreteBaseModels(shared.DatabaseTest):
             t.prop_b = 'foobar'
         session.commit()
 
+        history_counts = shared.history_counts(session, history_models)
         for attr, history in history_models.items():
-            clock_query = session.query(history)
-            assert clock_query.count() == 3, \
+            assert history_counts[attr] == 3, \
                 "%r missing a history entry for initial value" % history
 
-            recorded_history = clock_query[-1]
+            recorded_history = session.query(history).order_by(
+                history.vclock.desc()).first()
             assert 3 in recorded_history.vclock
             assert getattr(t, attr) == getattr(recorded_history, attr)
 
     def test_doesnt_duplicate_unnecessary_history(self, session):
-        history_models = {
-            'prop_a': temporal.get_history_model(
-                models.SimpleConcreteChildTemporalTable.prop_a),
-            'prop_b': temporal.get_history_model(
-                models.SimpleConcreteChildTemporalTable.prop_b),
-            'prop_c': temporal.get_history_model(
-                models.SimpleConcreteChildTemporalTable.prop_c),
-        }
+        history_models = SIMPLE_CHILD_HISTORY_MODELS
 
         t = models.SimpleConcreteChildTemporalTable(
             prop_a=1,
@@ -265,11 +241,11 @@ class TestTemporalConcreteBaseModels(shared.DatabaseTest):
         session.commit()
 
         assert t.vclock == 1
+        history_counts = shared.history_counts(session, history_models)
         for attr, history in history_models.items():
-            clock_query = session.query(history)
-            assert clock_query.count() == 1, \
+            assert history_counts[attr] == 1, \
                 "%r missing a history entry for initial value" % history
 
-            recorded_history = clock_query.first()
-            assert 1 in recorded_history.vclock
-            assert getattr(t, attr) == getattr(recorded_history, attr)
+            value, vclock = shared.first_history_row(session, history, attr)
+            assert 1 in vclock
+            assert getattr(t, attr) == value
@@ -4,7 +4,7 @@ import temporal_sqlalchemy as temporal
 from . import shared, models
 
 
-class TestEdgeCases(shared.DatabaseTest):
+class TestEdgeCases(shared.ConnectionTest):
 
     def test_indentifiers_too_long(self):
         models.edgecase_metadata.create_all(self.connection)
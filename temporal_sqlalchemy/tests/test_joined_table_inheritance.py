@@ -6,6 +6,13 @@ import temporal_sqlalchemy as temporal
 
 from . import models
 
+# resolved once at import instead of inspecting the mapper per
+# parametrized invocation
+_POLYMORPHIC_IDENTITY = {
+    model: sa.inspect(model).polymorphic_identity
+    for model in (models.JoinedEnumA, models.JoinedEnumB)
+}
+
 
 def test_joined_enums_create(session):
     session.add_all([
@@ -33,7 +40,7 @@ def test_joined_enums_create(session):
         (models.JoinedEnumB, 'bar', 'barfoo'),
 ))
 def test_joined_enums_edit(session, model, first_val, second_val):
-    kind = sa.inspect(model).polymorphic_identity
+    kind = _POLYMORPHIC_IDENTITY[model]
 
     session.add(model(val=first_val, is_deleted=False))
     session.commit()
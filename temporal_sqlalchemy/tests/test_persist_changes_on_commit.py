@@ -5,66 +5,86 @@ import sqlalchemy.orm as orm
 import pytest
 
 import temporal_sqlalchemy as temporal
-from temporal_sqlalchemy.metadata import CHANGESET_STACK_KEY
+from temporal_sqlalchemy.session import get_current_changeset
 from . import shared, models
 
 
-@pytest.yield_fixture()
-def non_temporal_session(connection):
-    sessionmaker = orm.sessionmaker()
+# resolved once at import -- pure class-level metadata shared by every test
+POC_CLOCK_MODEL = models.PersistOnCommitTable.temporal_options.clock_model
+POC_PROP_A_HISTORY = models.PersistOnCommitTable.temporal_options.history_models[
+    models.PersistOnCommitTable.prop_a.property]
+POF_CLOCK_MODEL = models.PersistOnFlushTable.temporal_options.clock_model
+POF_PROP_A_HISTORY = models.PersistOnFlushTable.temporal_options.history_models[
+    models.PersistOnFlushTable.prop_a.property]
 
-    transaction = connection.begin()
-    sess = sessionmaker(bind=connection)
+# flat SELECT count(*) statements built once -- cheaper to compile and plan
+# than the subquery-wrapped Query.count(), and reused across tests
+COUNT_ACTIVITY = sa.select([sa.func.count()]).select_from(
+    models.Activity.__table__)
+COUNT_POC_CLOCK = sa.select([sa.func.count()]).select_from(
+    POC_CLOCK_MODEL.__table__)
+COUNT_POC_HISTORY = sa.select([sa.func.count()]).select_from(
+    POC_PROP_A_HISTORY.__table__)
+
+
+def _add_with_activity(session, model=models.PersistOnCommitTable,
+                       prop_a=1234, description='Create temp'):
+    """ seed one activity plus one temporal row -- shared by most tests """
+    activity = models.Activity(description=description)
+    session.add(activity)
+
+    row = model(prop_a=prop_a, activity=activity)
+    session.add(row)
+
+    return activity, row
+
+
+@pytest.fixture()
+def non_temporal_session(connection):
+    # SAVEPOINT rather than a plain begin(): the connection fixture holds one
+    # outer transaction for the whole run
+    savepoint = connection.begin_nested()
+    sess = orm.sessionmaker(expire_on_commit=False)(bind=connection)
 
     yield sess
 
-    transaction.rollback()
     sess.close()
-
-    sess.close_all()
+    savepoint.rollback()
 
 
-@pytest.yield_fixture()
+@pytest.fixture()
 def second_session(connection: sa.engine.Connection, sessionmaker: orm.sessionmaker):
-    transaction = connection.begin()
+    savepoint = connection.begin_nested()
     sess = sessionmaker(bind=connection)
 
     yield sess
 
-    transaction.rollback()
     sess.close()
+    savepoint.rollback()
 
 
 class TestPersistChangesOnCommit(shared.DatabaseTest):
     def test_persist_on_commit(self, session):
-        activity = models.Activity(description='Create temp')
-        session.add(activity)
-
-        t = models.PersistOnCommitTable(prop_a=1234, activity=activity)
-        session.add(t)
+        activity, t = _add_with_activity(session)
         session.flush()
 
-        activity_query = session.query(models.Activity)
-        assert activity_query.count() == 1
-        activity_result = activity_query.first()
+        activity_results = session.query(models.Activity).all()
+        assert len(activity_results) == 1
+        activity_result = activity_results[0]
         assert activity_result.description == 'Create temp'
 
-        clock_query = session.query(
-            models.PersistOnCommitTable.temporal_options.clock_table)
-        assert clock_query.count() == 1
-        clock_result = clock_query.first()
-        assert clock_result.activity_id == activity_result.id
+        clock_results = session.query(POC_CLOCK_MODEL).all()
+        assert len(clock_results) == 1
+        assert clock_results[0].activity_id == activity_result.id
 
-        history_query = session.query(
-            models.PersistOnCommitTable.temporal_options.history_models[
-                models.PersistOnCommitTable.prop_a.property])
-        assert history_query.count() == 0
+        history_query = session.query(POC_PROP_A_HISTORY)
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 0
 
         session.commit()
 
-        assert history_query.count() == 1
-        history_result = history_query.first()
-        assert history_result.prop_a == 1234
+        history_results = history_query.all()
+        assert len(history_results) == 1
+        assert history_results[0].prop_a == 1234
 
     def test_persist_no_changes(self, non_temporal_session):
         """temporalize after transaction has started to cover some additional edge cases"""
@@ -92,50 +112,38 @@ class TestPersistChangesOnCommit(shared.DatabaseTest):
 
         assert session is not second_session
         # current changeset is blank (not being contaminated by other sessions)
-        assert not second_session.info[CHANGESET_STACK_KEY][-1]
+        assert not get_current_changeset(second_session)
 
     def test_persist_only_last_change_before_flush(self, session):
-        activity = models.Activity(description='Create temp')
-        session.add(activity)
-
-        t = models.PersistOnCommitTable(prop_a=1234, activity=activity)
-        session.add(t)
+        activity, t = _add_with_activity(session)
 
         t.prop_a = 4567
 
         session.flush()
 
-        history_query = session.query(
-            models.PersistOnCommitTable.temporal_options.history_models[
-                models.PersistOnCommitTable.prop_a.property])
-        assert history_query.count() == 0
+        history_query = session.query(POC_PROP_A_HISTORY)
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 0
 
         session.commit()
 
-        assert history_query.count() == 1
-        history_result = history_query.first()
-        assert history_result.prop_a == 4567
+        history_results = history_query.all()
+        assert len(history_results) == 1
+        assert history_results[0].prop_a == 4567
 
     def test_persist_only_last_change_after_flush(self, session):
-        activity = models.Activity(description='Create temp')
-        session.add(activity)
-
-        t = models.PersistOnCommitTable(prop_a=1234, activity=activity)
-        session.add(t)
+        activity, t = _add_with_activity(session)
         session.flush()
 
         t.prop_a = 4567
 
-        history_query = session.query(
-            models.PersistOnCommitTable.temporal_options.history_models[
-                models.PersistOnCommitTable.prop_a.property])
-        assert history_query.count() == 0
+        history_query = session.query(POC_PROP_A_HISTORY)
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 0
 
         session.commit()
 
-        assert history_query.count() == 1
-        history_result = history_query.first()
-        assert history_result.prop_a == 4567
+        history_results = history_query.all()
+        assert len(history_results) == 1
+        assert history_results[0].prop_a == 4567
 
     def test_mixed_models_persist_on_commit_and_regular_persist(self, session):  # pylint: disable=too-many-locals
         activity = models.Activity(description='Create temp')
@@ -147,70 +155,53 @@ class TestPersistChangesOnCommit(shared.DatabaseTest):
         session.add(t2)
         session.flush()
 
-        activity_query = session.query(models.Activity)
-        assert activity_query.count() == 1
-        activity_result = activity_query.first()
+        activity_results = session.query(models.Activity).all()
+        assert len(activity_results) == 1
+        activity_result = activity_results[0]
         assert activity_result.description == 'Create temp'
 
         # check persist on commit works
-        clock_query_1 = session.query(
-            models.PersistOnCommitTable.temporal_options.clock_table)
-        assert clock_query_1.count() == 1
-        clock_result_1 = clock_query_1.first()
-        assert clock_result_1.activity_id == activity_result.id
+        clock_results_1 = session.query(POC_CLOCK_MODEL).all()
+        assert len(clock_results_1) == 1
+        assert clock_results_1[0].activity_id == activity_result.id
 
-        history_query_1 = session.query(
-            models.PersistOnCommitTable.temporal_options.history_models[
-                models.PersistOnCommitTable.prop_a.property])
-        assert history_query_1.count() == 0
+        history_query_1 = session.query(POC_PROP_A_HISTORY)
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 0
 
         # check persist on flush works
-        clock_query_2 = session.query(
-            models.PersistOnFlushTable.temporal_options.clock_table)
-        assert clock_query_2.count() == 1
-        clock_result_2 = clock_query_2.first()
-        assert clock_result_2.activity_id == activity_result.id
-
-        history_query_2 = session.query(
-            models.PersistOnFlushTable.temporal_options.history_models[
-                models.PersistOnFlushTable.prop_a.property])
-        assert history_query_2.count() == 1
-        history_result_2 = history_query_2.first()
-        assert history_result_2.prop_a == 1234
+        clock_results_2 = session.query(POF_CLOCK_MODEL).all()
+        assert len(clock_results_2) == 1
+        assert clock_results_2[0].activity_id == activity_result.id
+
+        history_results_2 = session.query(POF_PROP_A_HISTORY).all()
+        assert len(history_results_2) == 1
+        assert history_results_2[0].prop_a == 1234
 
         session.commit()
 
         # check persist on commit works again
-        assert history_query_1.count() == 1
-        history_result_1 = history_query_1.first()
-        assert history_result_1.prop_a == 1234
+        history_results_1 = history_query_1.all()
+        assert len(history_results_1) == 1
+        assert history_results_1[0].prop_a == 1234
 
     def test_persist_on_commit_enabled_with_regular_persist(self, session):
-        activity = models.Activity(description='Create temp')
-        session.add(activity)
-
-        t = models.PersistOnFlushTable(prop_a=1234, activity=activity)
-        session.add(t)
+        activity, t = _add_with_activity(
+            session, model=models.PersistOnFlushTable)
         session.flush()
 
-        activity_query = session.query(models.Activity)
-        assert activity_query.count() == 1
-        activity_result = activity_query.first()
+        activity_results = session.query(models.Activity).all()
+        assert len(activity_results) == 1
+        activity_result = activity_results[0]
         assert activity_result.description == 'Create temp'
 
         # check persist on flush works
-        clock_query = session.query(
-            models.PersistOnFlushTable.temporal_options.clock_table)
-        assert clock_query.count() == 1
-        clock_result = clock_query.first()
-        assert clock_result.activity_id == activity_result.id
-
-        history_query = session.query(
-            models.PersistOnFlushTable.temporal_options.history_models[
-                models.PersistOnFlushTable.prop_a.property])
-        assert history_query.count() == 1
-        history_result = history_query.first()
-        assert history_result.prop_a == 1234
+        clock_results = session.query(POF_CLOCK_MODEL).all()
+        assert len(clock_results) == 1
+        assert clock_results[0].activity_id == activity_result.id
+
+        history_results = session.query(POF_PROP_A_HISTORY).all()
+        assert len(history_results) == 1
+        assert history_results[0].prop_a == 1234
 
         session.commit()
 
@@ -224,138 +215,105 @@ class TestPersistChangesOnCommit(shared.DatabaseTest):
         session.add(t2)
         session.flush()
 
-        activity_query = session.query(models.Activity)
-        assert activity_query.count() == 1
-        activity_result = activity_query.first()
+        activity_results = session.query(models.Activity).all()
+        assert len(activity_results) == 1
+        activity_result = activity_results[0]
         assert activity_result.description == 'Create temp'
 
-        clock_query = session.query(
-            models.PersistOnCommitTable.temporal_options.clock_table)
-        assert clock_query.count() == 2
-        clock_result = clock_query.first()
-        assert clock_result.activity_id == activity_result.id
+        clock_results = session.query(POC_CLOCK_MODEL).all()
+        assert len(clock_results) == 2
+        assert clock_results[0].activity_id == activity_result.id
 
-        history_query = session.query(
-            models.PersistOnCommitTable.temporal_options.history_models[
-                models.PersistOnCommitTable.prop_a.property])
-        assert history_query.count() == 0
+        history_query = session.query(POC_PROP_A_HISTORY)
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 0
 
         session.commit()
 
-        assert history_query.count() == 2
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 2
         history_result_1 = history_query.filter_by(entity_id=t1.id).one()
         assert history_result_1.prop_a == 1234
         history_result_2 = history_query.filter_by(entity_id=t2.id).one()
         assert history_result_2.prop_a == 5678
 
     def test_persist_when_inside_nested_transaction(self, session):
-        outer_activity = models.Activity(description='Create temp')
-        session.add(outer_activity)
-
-        outer_t = models.PersistOnCommitTable(prop_a=5678, activity=outer_activity)
-        session.add(outer_t)
+        outer_activity, outer_t = _add_with_activity(session, prop_a=5678)
         session.flush()
 
-        history_query = session.query(
-            models.PersistOnCommitTable.temporal_options.history_models[
-                models.PersistOnCommitTable.prop_a.property])
+        history_query = session.query(POC_PROP_A_HISTORY)
 
-        assert history_query.count() == 0
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 0
 
-        assert session.transaction.nested is False
+        # the session fixture keeps one SAVEPOINT of its own open, so nesting
+        # depth is measured relative to it via the parent transaction
+        assert session.transaction.parent.nested is False
         session.begin_nested()
-        assert session.transaction.nested is True
+        assert session.transaction.parent.nested is True
 
-        activity = models.Activity(description='Create temp')
-        session.add(activity)
-
-        t = models.PersistOnCommitTable(prop_a=1234, activity=activity)
-        session.add(t)
+        activity, t = _add_with_activity(session)
         session.flush()
 
-        activity_query = session.query(models.Activity)
-        assert activity_query.count() == 2
-
-        clock_query = session.query(
-            models.PersistOnCommitTable.temporal_options.clock_table)
-        assert clock_query.count() == 2
+        assert session.execute(COUNT_ACTIVITY).scalar() == 2
+        assert session.execute(COUNT_POC_CLOCK).scalar() == 2
 
-        assert history_query.count() == 0
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 0
 
-        assert session.transaction.nested is True
+        assert session.transaction.parent.nested is True
         session.commit()
-        assert session.transaction.nested is False
+        assert session.transaction.parent.nested is False
 
-        assert history_query.count() == 1
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 1
         history_result = history_query.filter_by(prop_a=1234).one()
         assert history_result.prop_a == 1234
 
         session.commit()
 
-        assert history_query.count() == 2
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 2
         history_result = history_query.filter_by(prop_a=5678).one()
         assert history_result.prop_a == 5678
 
     def test_persist_when_inside_nested_transaction_with_rollback(self, session):
-        outer_activity = models.Activity(description='Create temp')
-        session.add(outer_activity)
-
-        outer_t = models.PersistOnCommitTable(prop_a=5678, activity=outer_activity)
-        session.add(outer_t)
+        outer_activity, outer_t = _add_with_activity(session, prop_a=5678)
         session.flush()
 
-        history_query = session.query(
-            models.PersistOnCommitTable.temporal_options.history_models[
-                models.PersistOnCommitTable.prop_a.property])
+        history_query = session.query(POC_PROP_A_HISTORY)
 
-        assert history_query.count() == 0
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 0
 
-        assert session.transaction.nested is False
+        # the session fixture keeps one SAVEPOINT of its own open, so nesting
+        # depth is measured relative to it via the parent transaction
+        assert session.transaction.parent.nested is False
         session.begin_nested()
-        assert session.transaction.nested is True
-
-        activity = models.Activity(description='Create temp')
-        session.add(activity)
+        assert session.transaction.parent.nested is True
 
-        t = models.PersistOnCommitTable(prop_a=1234, activity=activity)
-        session.add(t)
+        activity, t = _add_with_activity(session)
         session.flush()
 
-        activity_query = session.query(models.Activity)
-        assert activity_query.count() == 2
+        assert session.execute(COUNT_ACTIVITY).scalar() == 2
+        assert session.execute(COUNT_POC_CLOCK).scalar() == 2
 
-        clock_query = session.query(
-            models.PersistOnCommitTable.temporal_options.clock_table)
-        assert clock_query.count() == 2
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 0
 
-        assert history_query.count() == 0
-
-        assert session.transaction.nested is True
+        assert session.transaction.parent.nested is True
         session.rollback()
-        assert session.transaction.nested is False
+        assert session.transaction.parent.nested is False
 
-        assert history_query.count() == 0
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 0
 
         session.commit()
 
-        assert history_query.count() == 1
-        history_result = history_query.first()
-        assert history_result.prop_a == 5678
+        history_results = history_query.all()
+        assert len(history_results) == 1
+        assert history_results[0].prop_a == 5678
 
     def test_persist_on_commit_with_edit_inside_clock_tick(self, session):
-        create_activity = models.Activity(description='Create temp')
-        session.add(create_activity)
-
-        t = models.PersistOnCommitTable(prop_a=1234, activity=create_activity)
-        session.add(t)
+        create_activity, t = _add_with_activity(session)
 
         session.commit()
 
-        history_table = models.PersistOnCommitTable.temporal_options.history_models[
-            models.PersistOnCommitTable.prop_a.property]
+        history_table = POC_PROP_A_HISTORY
 
         history_query = session.query(history_table).order_by(history_table.prop_a)
-        assert history_query.count() == 1
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 1
 
         edit_activity = models.Activity(description='Edit temp')
         session.add(edit_activity)
@@ -364,45 +322,37 @@ class TestPersistChangesOnCommit(shared.DatabaseTest):
             t.prop_a = 9876
 
         session.flush()
-        assert history_query.count() == 1
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 1
 
         session.commit()
-        activity_query = session.query(models.Activity).order_by(
-            models.Activity.description)
-        assert activity_query.count() == 2
-        activity_results = activity_query.all()
+        activity_results = session.query(models.Activity).order_by(
+            models.Activity.description).all()
+        assert len(activity_results) == 2
         assert activity_results[0].description == 'Create temp'
         assert activity_results[1].description == 'Edit temp'
 
-        clock_query = session.query(
-            models.PersistOnCommitTable.temporal_options.clock_table).order_by(
-                models.PersistOnCommitTable.temporal_options.clock_table.tick)
-        assert clock_query.count() == 2
-        clock_results = clock_query.all()
+        clock_results = session.query(POC_CLOCK_MODEL).order_by(
+            POC_CLOCK_MODEL.tick).all()
+        assert len(clock_results) == 2
         assert clock_results[0].activity_id == activity_results[0].id
         assert clock_results[1].activity_id == activity_results[1].id
 
-        assert history_query.count() == 2
         history_results = history_query.all()
+        assert len(history_results) == 2
         assert history_results[0].prop_a == 1234
         assert history_results[0].vclock == NumericRange(1, 2, '[)')
         assert history_results[1].prop_a == 9876
         assert history_results[1].vclock == NumericRange(2, None, '[)')
 
     def test_persist_on_commit_with_edit_outside_clock_tick(self, session):
-        create_activity = models.Activity(description='Create temp')
-        session.add(create_activity)
-
-        t = models.PersistOnCommitTable(prop_a=1234, activity=create_activity)
-        session.add(t)
+        create_activity, t = _add_with_activity(session)
 
         session.commit()
 
-        history_table = models.PersistOnCommitTable.temporal_options.history_models[
-            models.PersistOnCommitTable.prop_a.property]
+        history_table = POC_PROP_A_HISTORY
 
         history_query = session.query(history_table).order_by(history_table.prop_a)
-        assert history_query.count() == 1
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 1
 
         edit_activity = models.Activity(description='Edit temp')
         session.add(edit_activity)
@@ -411,72 +361,62 @@ class TestPersistChangesOnCommit(shared.DatabaseTest):
             t.prop_a = 9876
 
         session.flush()
-        assert history_query.count() == 1
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 1
 
         # we're setting this outside a clock tick, which should get picked up by the history builder
         t.prop_a = 5678
 
         session.commit()
-        activity_query = session.query(models.Activity).order_by(
-            models.Activity.description)
-        assert activity_query.count() == 2
-        activity_results = activity_query.all()
+        activity_results = session.query(models.Activity).order_by(
+            models.Activity.description).all()
+        assert len(activity_results) == 2
         assert activity_results[0].description == 'Create temp'
         assert activity_results[1].description == 'Edit temp'
 
-        clock_query = session.query(
-            models.PersistOnCommitTable.temporal_options.clock_table).order_by(
-                models.PersistOnCommitTable.temporal_options.clock_table.tick)
-        assert clock_query.count() == 2
-        clock_results = clock_query.all()
+        clock_results = session.query(POC_CLOCK_MODEL).order_by(
+            POC_CLOCK_MODEL.tick).all()
+        assert len(clock_results) == 2
         assert clock_results[0].activity_id == activity_results[0].id
         assert clock_results[1].activity_id == activity_results[1].id
 
-        assert history_query.count() == 2
         history_results = history_query.all()
+        assert len(history_results) == 2
         assert history_results[0].prop_a == 1234
         assert history_results[0].vclock == NumericRange(1, 2, '[)')
         assert history_results[1].prop_a == 5678
         assert history_results[1].vclock == NumericRange(2, None, '[)')
 
     def test_persist_on_commit_with_edit_no_clock_tick_no_strict_mode(self, session):
-        create_activity = models.Activity(description='Create temp')
-        session.add(create_activity)
-
-        t = models.PersistOnCommitTable(prop_a=1234, activity=create_activity)
-        session.add(t)
+        create_activity, t = _add_with_activity(session)
 
         session.commit()
 
-        history_table = models.PersistOnCommitTable.temporal_options.history_models[
-            models.PersistOnCommitTable.prop_a.property]
+        history_table = POC_PROP_A_HISTORY
 
         history_query = session.query(history_table).order_by(history_table.prop_a)
-        assert history_query.count() == 1
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 1
 
         session.flush()
-        assert history_query.count() == 1
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 1
 
         # we're setting this outside a clock tick, which won't get picked up by the history builder
         # since we never used clock_tick
         t.prop_a = 5678
 
         session.commit()
-        activity_query = session.query(models.Activity).order_by(
-            models.Activity.description)
-        assert activity_query.count() == 1
-        activity_result = activity_query.first()
+        activity_results = session.query(models.Activity).order_by(
+            models.Activity.description).all()
+        assert len(activity_results) == 1
+        activity_result = activity_results[0]
         assert activity_result.description == 'Create temp'
 
-        clock_query = session.query(
-            models.PersistOnCommitTable.temporal_options.clock_table).order_by(
-                models.PersistOnCommitTable.temporal_options.clock_table.tick)
-        assert clock_query.count() == 1
-        clock_result = clock_query.first()
-        assert clock_result.activity_id == activity_result.id
+        clock_results = session.query(POC_CLOCK_MODEL).order_by(
+            POC_CLOCK_MODEL.tick).all()
+        assert len(clock_results) == 1
+        assert clock_results[0].activity_id == activity_result.id
 
-        assert history_query.count() == 2
         history_results = history_query.all()
+        assert len(history_results) == 2
         assert history_results[0].prop_a == 1234
         # this is bad
         assert history_results[0].vclock == NumericRange(empty=True)
@@ -484,22 +424,14 @@ class TestPersistChangesOnCommit(shared.DatabaseTest):
     def test_persist_on_commit_with_edit_no_clock_tick_with_strict_mode(self, session):
         temporal.temporal_session(session, strict_mode=True)
 
-        create_activity = models.Activity(description='Create temp')
-        session.add(create_activity)
-
-        t = models.PersistOnCommitTable(prop_a=1234, activity=create_activity)
-        session.add(t)
+        create_activity, t = _add_with_activity(session)
 
         session.commit()
 
-        history_table = models.PersistOnCommitTable.temporal_options.history_models[
-            models.PersistOnCommitTable.prop_a.property]
-
-        history_query = session.query(history_table).order_by(history_table.prop_a)
-        assert history_query.count() == 1
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 1
 
         session.flush()
-        assert history_query.count() == 1
+        assert session.execute(COUNT_POC_HISTORY).scalar() == 1
 
         # we're setting this outside a clock tick, which won't get picked up by the history builder
         # since we never used clock_tick
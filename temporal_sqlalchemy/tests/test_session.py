@@ -5,7 +5,9 @@ import pytest
 import sqlalchemy.orm as orm
 
 from . import shared, models
-from temporal_sqlalchemy import is_temporal_session, temporal_session
+from temporal_sqlalchemy import bases, is_temporal_session, persist_history, temporal_session
+from temporal_sqlalchemy import session as session_module
+from temporal_sqlalchemy.metadata import TEMPORAL_METADATA_KEY
 
 
 class TestSession(shared.DatabaseTest):
@@ -43,3 +45,46 @@ class TestSession(shared.DatabaseTest):
                 assert not is_temporal_session(raw_session)
             finally:
                 raw_session.close()
+
+
+def test_flush_hook_bails_when_no_temporal_classes():
+    """with nothing ever temporalized, the flush hook must do no bookkeeping"""
+    saved_registry = set(bases.TEMPORAL_CLASS_REGISTRY)
+    bases.TEMPORAL_CLASS_REGISTRY.clear()
+    sess = temporal_session(orm.Session())
+    try:
+        persist_history(sess, None, None)
+
+        assert TEMPORAL_METADATA_KEY not in sess.info
+    finally:
+        bases.TEMPORAL_CLASS_REGISTRY.update(saved_registry)
+        sess.close()
+
+
+def test_release_changeset_drops_dicts_past_pool_cap():  # pylint: disable=protected-access
+    saved_pool = session_module._CHANGESET_POOL[:]
+    session_module._CHANGESET_POOL[:] = [
+        {} for _ in range(session_module._CHANGESET_POOL_MAX_SIZE)]
+    overflow = {'key': 'value'}
+    try:
+        session_module._release_changeset(overflow)
+
+        assert (len(session_module._CHANGESET_POOL)
+                == session_module._CHANGESET_POOL_MAX_SIZE)
+        assert all(pooled is not overflow
+                   for pooled in session_module._CHANGESET_POOL)
+        # dropped changesets are left to the garbage collector undrained
+        assert overflow == {'key': 'value'}
+    finally:
+        session_module._CHANGESET_POOL[:] = saved_pool
+
+
+def test_temporal_session_overrides_expire_on_commit():
+    sess = orm.Session(expire_on_commit=True)
+    try:
+        temporal_session(sess, expire_on_commit=False)
+
+        assert sess.expire_on_commit is False
+        assert is_temporal_session(sess)
+    finally:
+        sess.close()
@@ -9,6 +9,14 @@ import temporal_sqlalchemy as temporal
 from . import shared, models
 
 
+# resolved once at import -- class-level metadata shared by most tests below
+NEW_STYLE_CLOCK_MODEL = models.NewStyleModel.temporal_options.clock_model
+NEW_STYLE_HISTORY_MODELS = {
+    attr: temporal.get_history_model(getattr(models.NewStyleModel, attr))
+    for attr in ('description', 'int_prop', 'bool_prop', 'datetime_prop')
+}
+
+
 def test_declaration_check():
     with pytest.raises(AssertionError):
         class Error(models.Base, temporal.TemporalModel):  # pylint: disable=unused-variable
@@ -30,9 +38,7 @@ def test_create_temporal_options():
 
 
 def test_creates_clock_model():
-    options = models.NewStyleModel.temporal_options
-
-    clock_model = options.clock_model
+    clock_model = NEW_STYLE_CLOCK_MODEL
     assert clock_model.__table__.name == '%s_clock' % models.NewStyleModel.__table__.name
 
     inspected = sa.inspect(clock_model)
@@ -53,9 +59,7 @@ class TestTemporalModelMixin(shared.DatabaseTest):
         )
 
     def test_creates_clock_table(self):
-        options = models.NewStyleModel.temporal_options
-
-        clock_table = options.clock_model.__table__
+        clock_table = NEW_STYLE_CLOCK_MODEL.__table__
         assert self.has_table(
             self.connection,
             clock_table.name,
@@ -65,65 +69,58 @@ class TestTemporalModelMixin(shared.DatabaseTest):
     def test_create_history_tables(self):
         table_name = models.NewStyleModel.__table__.name
         # sanity check the current state table first
-        assert self.has_table(self.connection, table_name, schema=models.SCHEMA)
+        assert table_name in self.existing_tables(self.connection,
+                                                  models.SCHEMA)
         # then check the history tables
-        assert self.has_table(self.connection, '%s_history_description' % table_name)
-        assert self.has_table(self.connection, '%s_history_int_prop' % table_name)
-        assert self.has_table(self.connection, '%s_history_bool_prop' % table_name)
-        assert self.has_table(self.connection, '%s_history_datetime_prop' % table_name)
+        assert {'%s_history_%s' % (table_name, prop)
+                for prop in ('description', 'int_prop', 'bool_prop',
+                             'datetime_prop')} \
+            <= self.existing_tables(self.connection)
 
     def test_init_adds_clock_tick(self, session, newstylemodel):
-        clock_query = session.query(
-            models.NewStyleModel.temporal_options.clock_model).count()
+        clock_query = session.query(NEW_STYLE_CLOCK_MODEL).count()
         assert clock_query == 0
         assert newstylemodel.clock.count() == 1
 
         session.add(newstylemodel)
         session.commit()
 
-        t = session.query(models.NewStyleModel).first()
-        clock_query = session.query(
-            models.NewStyleModel.temporal_options.clock_model)
-        assert clock_query.count() == 1
+        # identity-map lookup by known primary key -- no SELECT needed
+        t = session.query(models.NewStyleModel).get(newstylemodel.id)
+        clocks = session.query(NEW_STYLE_CLOCK_MODEL).all()
+        assert len(clocks) == 1
         assert t.vclock == 1
         assert t.clock.count() == 1
 
-        clock = clock_query.first()
-
-        for attr, backref in [
-            ('description', 'description_history'),
-            ('int_prop', 'int_prop_history'),
-            ('bool_prop', 'bool_prop_history'),
-            ('datetime_prop', 'datetime_prop_history'),
-        ]:
-            history_model = temporal.get_history_model(getattr(models.NewStyleModel, attr))
-            backref_history_query = getattr(t, backref)
-            clock_query = session.query(history_model).count()
-            assert clock_query == 1, "missing entry for %r" % history_model
-            assert clock_query == backref_history_query.count()
-
-            backref_history = backref_history_query[0]
-            history = session.query(history_model).first()
+        clock = clocks[0]
+
+        for attr, history_model in NEW_STYLE_HISTORY_MODELS.items():
+            history_rows = session.query(history_model).all()
+            assert len(history_rows) == 1, "missing entry for %r" % history_model
+
+            backref_history_rows = getattr(t, '%s_history' % attr).all()
+            assert len(backref_history_rows) == len(history_rows)
+
+            history = history_rows[0]
+            backref_history = backref_history_rows[0]
             assert clock.tick in history.vclock
             assert clock.tick in backref_history.vclock
             assert getattr(history, attr) == getattr(t, attr) == getattr(backref_history, attr)
 
     def test_date_created(self, session, newstylemodel):
-        clock_model = models.NewStyleModel.temporal_options.clock_model
         session.add(newstylemodel)
         session.commit()
 
-        tick = session.query(clock_model).filter_by(tick=1, entity_id=newstylemodel.id).one()
+        tick = session.query(NEW_STYLE_CLOCK_MODEL).filter_by(tick=1, entity_id=newstylemodel.id).one()
         assert newstylemodel.vclock == 1
         assert newstylemodel.clock.count() == 1
         assert newstylemodel.date_created == tick.timestamp
 
     def test_date_modified(self, session, newstylemodel):
-        clock_model = models.NewStyleModel.temporal_options.clock_model
         session.add(newstylemodel)
         session.commit()
 
-        first_tick = session.query(clock_model).filter_by(tick=1, entity_id=newstylemodel.id).one()
+        first_tick = session.query(NEW_STYLE_CLOCK_MODEL).filter_by(tick=1, entity_id=newstylemodel.id).one()
         assert newstylemodel.vclock == 1
         assert newstylemodel.clock.count() == 1
         assert newstylemodel.date_created == first_tick.timestamp
@@ -134,15 +131,13 @@ class TestTemporalModelMixin(shared.DatabaseTest):
 
         session.commit()
 
-        second_tick = session.query(clock_model).filter_by(tick=1, entity_id=newstylemodel.id).one()
+        second_tick = session.query(NEW_STYLE_CLOCK_MODEL).filter_by(tick=1, entity_id=newstylemodel.id).one()
         assert newstylemodel.vclock == 2
         assert newstylemodel.clock.count() == 2
         assert newstylemodel.date_created == first_tick.timestamp
         assert newstylemodel.date_modified == second_tick.timestamp
 
     def test_clock_tick_editing(self, session, newstylemodel):
-        clock_model = models.NewStyleModel.temporal_options.clock_model
-
         session.add(newstylemodel)
         session.commit()
 
@@ -155,41 +150,33 @@ class TestTemporalModelMixin(shared.DatabaseTest):
 
         session.commit()
 
-        t = session.query(models.NewStyleModel).first()
-        clock_query = session.query(clock_model)
-        assert clock_query.count() == 2
+        # identity-map lookup by known primary key -- no SELECT needed
+        t = session.query(models.NewStyleModel).get(newstylemodel.id)
+        clocks = session.query(NEW_STYLE_CLOCK_MODEL).order_by(
+            NEW_STYLE_CLOCK_MODEL.tick).all()
+        assert len(clocks) == 2
 
-        create_clock = clock_query.first()
-        update_clock = clock_query.order_by(
-            clock_model.timestamp.desc()).first()
+        create_clock, update_clock = clocks
         assert create_clock.timestamp == t.date_created
         assert update_clock.timestamp == t.date_modified
 
         assert t.vclock == 2
         assert t.clock.count() == 2
 
-        clock = (
-            clock_query
-            .order_by(clock_model.tick.desc())
-            .first())
-        for history_model in (models.NewStyleModel
-                              .temporal_options.history_models.values()):
-            clock_query = session.query(history_model).count()
-            assert clock_query == 2
-
-            history = (
+        clock = update_clock
+        for history_model in NEW_STYLE_HISTORY_MODELS.values():
+            history_rows = (
                 session.query(history_model)
-                .order_by(history_model.vclock.desc()).first())
-            assert clock.tick in history.vclock
+                .order_by(history_model.vclock).all())
+            assert len(history_rows) == 2
+            assert clock.tick in history_rows[-1].vclock
 
     def test_disallaw_same_tick_for_same_entity(self, session, newstylemodel):
-        clock_model = models.NewStyleModel.temporal_options.clock_model
-
         session.add(newstylemodel)
         session.commit()
 
-        first_tick = session.query(clock_model).first()
-        duplicate_tick = clock_model(
+        first_tick = session.query(NEW_STYLE_CLOCK_MODEL).first()
+        duplicate_tick = NEW_STYLE_CLOCK_MODEL(
             tick=first_tick.tick,
             entity_id=first_tick.entity_id,
             activity=models.Activity(description="Inserting a duplicate"),
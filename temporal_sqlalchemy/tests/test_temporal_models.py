@@ -10,6 +10,22 @@ import temporal_sqlalchemy as temporal
 
 from . import shared, models
 
+# compiled once -- matched in several parametrized strict-mode tests
+_STRICT_MSG_RE = re.compile(
+    r'flush\(\) has triggered for a changed temporalized property '
+    r'outside of a clock tick')
+
+# resolved once at import -- these lookups are pure metadata and identical
+# for every test in this module
+SIMPLE_CLOCK_MODEL = models.SimpleTableTemporal.temporal_options.clock_model
+SIMPLE_HISTORY_MODELS = shared.history_models_for(
+    models.SimpleTableTemporal, 'prop_a', 'prop_b', 'prop_c')
+SIMPLE_HISTORY_MODEL_LIST = tuple(
+    models.SimpleTableTemporal.temporal_options.history_models.values())
+DEFAULT_TABLE_HISTORY_MODELS = shared.history_models_for(
+    models.TemporalTableWithDefault,
+    'prop_a', 'prop_b', 'prop_default', 'prop_callable', 'prop_func')
+
 
 class TestTemporalModels(shared.DatabaseTest):
 
@@ -36,10 +52,13 @@ class TestTemporalModels(shared.DatabaseTest):
     def test_creates_temporal_tables(self):
         table_name = models.SimpleTableTemporal.__table__.name
 
-        assert self.has_table(self.connection, table_name, schema=models.SCHEMA)
-        assert self.has_table(self.connection, '%s_clock' % table_name)
-        assert self.has_table(self.connection, '%s_history_prop_a' % table_name)
-        assert self.has_table(self.connection, '%s_history_prop_b' % table_name)
+        entity_tables = self.existing_tables(self.connection, models.SCHEMA)
+        temporal_tables = self.existing_tables(self.connection)
+
+        assert table_name in entity_tables
+        assert '%s_clock' % table_name in temporal_tables
+        assert {'%s_history_prop_a' % table_name,
+                '%s_history_prop_b' % table_name} <= temporal_tables
 
     def test_init_adds_clock_tick(self, session):
         clock_query = session.query(
@@ -60,24 +79,21 @@ class TestTemporalModels(shared.DatabaseTest):
 
         clock = clock_query.first()
 
-        prop_a_history_model = temporal.get_history_model(
-            models.SimpleTableTemporal.prop_a)
-        prop_b_history_model = temporal.get_history_model(
-            models.SimpleTableTemporal.prop_b)
-
-        for attr, history_table in [
-                ('prop_a', prop_a_history_model),
-                ('prop_b', prop_b_history_model),
-                ]:
-            clock_query = session.query(history_table).count()
-            assert clock_query == 1, "missing entry for %r" % history_table
+        history_models = {
+            attr: SIMPLE_HISTORY_MODELS[attr]
+            for attr in ('prop_a', 'prop_b')
+        }
+        history_counts = shared.history_counts(session, history_models)
+        for attr, history_table in history_models.items():
+            assert history_counts[attr] == 1, \
+                "missing entry for %r" % history_table
 
-            history = session.query(history_table).first()
-            assert clock.tick in history.vclock
-            assert getattr(history, attr) == getattr(t, attr)
+            value, vclock = shared.first_history_row(
+                session, history_table, attr)
+            assert clock.tick in vclock
+            assert value == getattr(t, attr)
 
     def test_clock_tick_editing(self, session):
-        clock_table = models.SimpleTableTemporal.temporal_options.clock_table
         t = models.SimpleTableTemporal(
             prop_a=1,
             prop_b='foo',
@@ -104,32 +120,24 @@ class TestTemporalModels(shared.DatabaseTest):
         session.commit()
 
         t = session.query(models.SimpleTableTemporal).first()
-        clock_query = session.query(clock_table)
-        assert clock_query.count() == 2
+        clocks = session.query(SIMPLE_CLOCK_MODEL).order_by(
+            SIMPLE_CLOCK_MODEL.tick).all()
+        assert len(clocks) == 2
 
-        create_clock = clock_query.first()
-        update_clock = clock_query.order_by(
-            clock_table.timestamp.desc()).first()
+        create_clock, update_clock = clocks
         assert create_clock.timestamp == t.date_created
         assert update_clock.timestamp == t.date_modified
 
         assert t.vclock == 2
         assert t.clock.count() == 2
 
-        clock = (
-            clock_query
-            .order_by(models.SimpleTableTemporal
-                      .temporal_options.clock_table.tick.desc())
-            .first())
-        for history_table in (models.SimpleTableTemporal
-                              .temporal_options.history_tables.values()):
-            clock_query = session.query(history_table).count()
-            assert clock_query == 2
-
-            history = (
+        clock = update_clock
+        for history_table in SIMPLE_HISTORY_MODEL_LIST:
+            history_rows = (
                 session.query(history_table)
-                .order_by(history_table.vclock.desc()).first())
-            assert clock.tick in history.vclock
+                .order_by(history_table.vclock).all())
+            assert len(history_rows) == 2
+            assert clock.tick in history_rows[-1].vclock
 
     def test_clock_table_has_no_activity_columns(self):
         assert models.SimpleTableTemporal.temporal_options.activity_cls is None
@@ -155,59 +163,49 @@ class TestTemporalModels(shared.DatabaseTest):
         assert isinstance(t.prop_func, datetime.datetime)
 
         clock = clock_query.first()
-        history_tables = {
-            'prop_func': temporal.get_history_model(
-                models.TemporalTableWithDefault.prop_func),
-            'prop_callable': temporal.get_history_model(
-                models.TemporalTableWithDefault.prop_callable),
-            'prop_default': temporal.get_history_model(
-                models.TemporalTableWithDefault.prop_default),
-            'prop_a': temporal.get_history_model(
-                models.TemporalTableWithDefault.prop_a),
-            'prop_b': temporal.get_history_model(
-                models.TemporalTableWithDefault.prop_b),
-        }
-        for attr, history in history_tables.items():
-            clock_query = session.query(history)
-            assert clock_query.count() == 1, \
+
+        # one round-trip for all of the per-history-table counts
+        history_counts = shared.history_counts(
+            session, DEFAULT_TABLE_HISTORY_MODELS)
+        for attr, history in DEFAULT_TABLE_HISTORY_MODELS.items():
+            assert history_counts[attr] == 1, \
                 "%r missing a history entry for initial value" % history
 
-            recorded_history = clock_query.first()
-            assert clock.tick in recorded_history.vclock
-            assert getattr(t, attr) == getattr(recorded_history, attr)
+            value, vclock = shared.first_history_row(session, history, attr)
+            assert clock.tick in vclock
+            assert getattr(t, attr) == value
 
     def test_multiple_edits(self, session):
-        history_tables = {
-            'prop_a': temporal.get_history_model(
-                models.SimpleTableTemporal.prop_a),
-            'prop_b': temporal.get_history_model(
-                models.SimpleTableTemporal.prop_b),
+        history_models = {
+            attr: SIMPLE_HISTORY_MODELS[attr]
+            for attr in ('prop_a', 'prop_b')
         }
 
         t = models.SimpleTableTemporal(prop_a=1, prop_b='foo')
         session.add(t)
         session.commit()
 
-        for attr, history in history_tables.items():
-            clock_query = session.query(history)
-            assert clock_query.count() == 1, \
+        history_counts = shared.history_counts(session, history_models)
+        for attr, history in history_models.items():
+            assert history_counts[attr] == 1, \
                 "%r missing a history entry for initial value" % history
 
-            recorded_history = clock_query.first()
-            assert 1 in recorded_history.vclock
-            assert getattr(t, attr) == getattr(recorded_history, attr)
+            value, vclock = shared.first_history_row(session, history, attr)
+            assert 1 in vclock
+            assert getattr(t, attr) == value
 
         with t.clock_tick():
             t.prop_a = 2
             t.prop_b = 'bar'
         session.commit()
 
-        for attr, history in history_tables.items():
-            clock_query = session.query(history)
-            assert clock_query.count() == 2, \
+        history_counts = shared.history_counts(session, history_models)
+        for attr, history in history_models.items():
+            assert history_counts[attr] == 2, \
                 "%r missing a history entry for initial value" % history
 
-            recorded_history = clock_query[-1]
+            recorded_history = session.query(history).order_by(
+                history.vclock.desc()).first()
             assert 2 in recorded_history.vclock
             assert getattr(t, attr) == getattr(recorded_history, attr)
 
@@ -216,12 +214,13 @@ class TestTemporalModels(shared.DatabaseTest):
             t.prop_b = 'foobar'
         session.commit()
 
-        for attr, history in history_tables.items():
-            clock_query = session.query(history)
-            assert clock_query.count() == 3, \
+        history_counts = shared.history_counts(session, history_models)
+        for attr, history in history_models.items():
+            assert history_counts[attr] == 3, \
                 "%r missing a history entry for initial value" % history
 
-            recorded_history = clock_query[-1]
+            recorded_history = session.query(history).order_by(
+                history.vclock.desc()).first()
             assert 3 in recorded_history.vclock
             assert getattr(t, attr) == getattr(recorded_history, attr)
 
@@ -247,30 +246,22 @@ class TestTemporalModels(shared.DatabaseTest):
             t.prop_b = 'bar'
         double_wrapped_session.commit()
 
-        history_tables = {
-            'prop_a': temporal.get_history_model(
-                models.SimpleTableTemporal.prop_a),
-            'prop_b': temporal.get_history_model(
-                models.SimpleTableTemporal.prop_b),
+        history_models = {
+            attr: SIMPLE_HISTORY_MODELS[attr]
+            for attr in ('prop_a', 'prop_b')
         }
-        for attr, history in history_tables.items():
-            clock_query = session.query(history)
-            assert clock_query.count() == 2, \
+        history_counts = shared.history_counts(session, history_models)
+        for attr, history in history_models.items():
+            assert history_counts[attr] == 2, \
                 "%r missing a history entry for initial value" % history
 
-            recorded_history = clock_query[-1]
+            recorded_history = session.query(history).order_by(
+                history.vclock.desc()).first()
             assert 2 in recorded_history.vclock
             assert getattr(t, attr) == getattr(recorded_history, attr)
 
     def test_doesnt_duplicate_unnecessary_history(self, session):
-        history_tables = {
-            'prop_a': temporal.get_history_model(
-                models.SimpleTableTemporal.prop_a),
-            'prop_b': temporal.get_history_model(
-                models.SimpleTableTemporal.prop_b),
-            'prop_c': temporal.get_history_model(
-                models.SimpleTableTemporal.prop_c),
-        }
+        history_models = SIMPLE_HISTORY_MODELS
 
         t = models.SimpleTableTemporal(
             prop_a=1,
@@ -289,14 +280,14 @@ class TestTemporalModels(shared.DatabaseTest):
         session.commit()
 
         assert t.vclock == 1
-        for attr, history in history_tables.items():
-            clock_query = session.query(history)
-            assert clock_query.count() == 1, \
+        history_counts = shared.history_counts(session, history_models)
+        for attr, history in history_models.items():
+            assert history_counts[attr] == 1, \
                 "%r missing a history entry for initial value" % history
 
-            recorded_history = clock_query.first()
-            assert 1 in recorded_history.vclock
-            assert getattr(t, attr) == getattr(recorded_history, attr)
+            value, vclock = shared.first_history_row(session, history, attr)
+            assert 1 in vclock
+            assert getattr(t, attr) == value
 
     @pytest.mark.parametrize('session_func_name', (
         'flush',
@@ -319,10 +310,7 @@ class TestTemporalModels(shared.DatabaseTest):
             with pytest.raises(AssertionError) as excinfo:
                 getattr(session, session_func_name)()
 
-            assert re.match(
-                r'.*flush\(\) has triggered for a changed temporalized property outside of a clock tick.*',
-                str(excinfo),
-            )
+            assert _STRICT_MSG_RE.search(str(excinfo))
 
     @pytest.mark.parametrize('session_func_name', (
         'flush',
@@ -365,10 +353,7 @@ class TestTemporalModels(shared.DatabaseTest):
         with pytest.raises(AssertionError) as excinfo:
             getattr(session, session_func_name)()
 
-        assert re.match(
-            r'.*flush\(\) has triggered for a changed temporalized property outside of a clock tick.*',
-            str(excinfo),
-        )
+        assert _STRICT_MSG_RE.search(str(excinfo))
 
     # TODO this test should be removed once strict flush() checking becomes the default behavior
     @pytest.mark.parametrize('session_func_name', (
@@ -393,3 +378,37 @@ class TestTemporalModels(shared.DatabaseTest):
         # this should also succeed in non-strict mode
         t.prop_a = 3
         getattr(session, session_func_name)()
+
+    def test_bulk_load_history(self, session):
+        history_model = SIMPLE_HISTORY_MODELS['prop_a']
+
+        # loading nothing is a no-op
+        temporal.bulk_load_history(session, history_model, iter([]))
+        assert session.query(history_model).count() == 0
+
+        # backfills bypass the ORM wholesale, the entity row included
+        session.execute(models.SimpleTableTemporal.__table__.insert(), [
+            {'id': 1, 'vclock': 3, 'prop_a': 30, 'prop_b': 'foo'}])
+
+        base = datetime.datetime(2016, 5, 11, tzinfo=datetime.timezone.utc)
+        day = datetime.timedelta(days=1)
+        temporal.bulk_load_history(session, history_model, (
+            {
+                'entity_id': 1,
+                'prop_a': tick * 10,
+                'vclock': psql_extras.NumericRange(tick, tick + 1, '[)'),
+                'effective': psql_extras.DateTimeTZRange(
+                    base + (tick - 1) * day, base + tick * day, '[)'),
+            }
+            for tick in (1, 2, 3)
+        ))
+
+        history = session.query(history_model) \
+            .order_by(history_model.vclock).all()
+        assert len(history) == 3
+        assert [row.prop_a for row in history] == [10, 20, 30]
+        # the id column default still applies per row
+        assert all(row.id is not None for row in history)
+        for tick, row in enumerate(history, 1):
+            assert tick in row.vclock
+            assert base + (tick - 1) * day in row.effective
@@ -1,9 +1,19 @@
 # pylint: disable=missing-docstring, no-self-use
 import sqlalchemy as sa
 
+import temporal_sqlalchemy as temporal
+
 from . import shared, models
 
 
+# resolved once at import -- pure class-level metadata, identical per test
+REL_CLOCK_MODEL = models.RelationalTemporalModel.temporal_options.clock_model
+REL_HISTORY_MODEL = temporal.get_history_model(
+    models.RelationalTemporalModel.rel)
+REL_HISTORY_MODEL_LIST = tuple(
+    models.RelationalTemporalModel.temporal_options.history_models.values())
+
+
 class TestTemporalRelationshipModels(shared.DatabaseTest):
     def test_assign_by_rel_on_init(self, session):
         related = models.RelatedTable(prop_a=1)
@@ -15,13 +25,11 @@ class TestTemporalRelationshipModels(shared.DatabaseTest):
         session.add(parent)
         session.commit()
 
-        clock_query = session.query(
-            models.RelationalTemporalModel.temporal_options.clock_table)
+        clock_query = session.query(REL_CLOCK_MODEL)
         clock_tick = clock_query.first()
         assert clock_query.count() == 1
         assert clock_tick.tick == parent.vclock
-        for history_class in (models.RelationalTemporalModel
-                              .temporal_options.history_tables.values()):
+        for history_class in REL_HISTORY_MODEL_LIST:
             property_history = session.query(history_class)
             assert property_history.count() == 1, \
                 "missing history #1 for %r" % history_class
@@ -45,9 +53,7 @@ class TestTemporalRelationshipModels(shared.DatabaseTest):
         session.commit()
         assert parent.vclock == 2
 
-        rel_prop = sa.inspect(models.RelationalTemporalModel.rel).property
-        history_class = (models.RelationalTemporalModel
-                         .temporal_options.history_tables[rel_prop])
+        history_class = REL_HISTORY_MODEL
 
         property_history = (
             session.query(history_class)
@@ -82,9 +88,7 @@ class TestTemporalRelationshipModels(shared.DatabaseTest):
         session.commit()
         assert parent.vclock == 2
 
-        rel_prop = sa.inspect(models.RelationalTemporalModel.rel).property
-        history_class = (models.RelationalTemporalModel
-                         .temporal_options.history_tables[rel_prop])
+        history_class = REL_HISTORY_MODEL
 
         property_history = (
             session.query(history_class)
@@ -117,9 +121,7 @@ class TestTemporalRelationshipModels(shared.DatabaseTest):
         session.commit()
         assert parent.vclock == 2
 
-        rel_prop = sa.inspect(models.RelationalTemporalModel.rel).property
-        history_class = (models.RelationalTemporalModel
-                         .temporal_options.history_tables[rel_prop])
+        history_class = REL_HISTORY_MODEL
 
         property_history = (
             session.query(history_class)
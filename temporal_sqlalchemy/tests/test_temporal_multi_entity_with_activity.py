@@ -11,8 +11,7 @@ class TestTemporalMultiEntityWithActivity(shared.DatabaseTest):
 
         t1 = models.FirstTemporalWithActivity(column=1234, activity=activity)
         t2 = models.SecondTemporalWithActivity(column=4567, activity=activity)
-        session.add(t1)
-        session.add(t2)
+        session.add_all([t1, t2])
         session.commit()
 
         activity_query = session.query(models.Activity)
@@ -31,7 +30,7 @@ class TestTemporalMultiEntityWithActivity(shared.DatabaseTest):
         assert t1.vclock == 1
         assert t1.clock.count() == 1
 
-        t2 = session.query(models.FirstTemporalWithActivity).first()
+        t2 = session.query(models.SecondTemporalWithActivity).first()
         assert t2.vclock == 1
         assert t2.clock.count() == 1
 
@@ -56,8 +55,7 @@ class TestTemporalMultiEntityWithActivity(shared.DatabaseTest):
             column=1234, activity=create_activity)
         t2 = models.SecondTemporalWithActivity(
             column=4567, activity=create_activity)
-        session.add(t1)
-        session.add(t2)
+        session.add_all([t1, t2])
         session.commit()
 
         edit_activity = models.Activity(description='Edit temp')
@@ -99,7 +97,7 @@ class TestTemporalMultiEntityWithActivity(shared.DatabaseTest):
         assert t1.vclock == 2
         assert t1.clock.count() == 2
 
-        t2 = session.query(models.FirstTemporalWithActivity).first()
+        t2 = session.query(models.SecondTemporalWithActivity).first()
         assert t2.vclock == 2
         assert t2.clock.count() == 2
 
@@ -1,5 +1,6 @@
 """ utility functions """
 import datetime as dt
+import functools
 import typing
 
 import psycopg2.extras as psql_extras
@@ -14,59 +15,106 @@ from temporal_sqlalchemy import bases
 
 def foreign_key_to(table: sa.Table,
                    prefix='entity',
-                   **opts) -> typing.Iterable[sa.Column]:  # pylint: disable=unsubscriptable-object
-    """ generate a columns that support scalar or composite foreign keys to given table """
-    for pk in table.primary_key:
-        name = '%s_%s' % (prefix, pk.name)
-        yield sa.Column(name, pk.type, sa.ForeignKey(pk), **opts)
+                   **opts) -> typing.List[sa.Column]:  # pylint: disable=unsubscriptable-object
+    """ build columns that support scalar or composite foreign keys to given table """
+    return [
+        sa.Column('%s_%s' % (prefix, pk.name), pk.type, sa.ForeignKey(pk),
+                  **opts)
+        for pk in table.primary_key
+    ]
+
+
+# bound once: effective_now runs on every history row and the attribute
+# chains would otherwise be re-resolved per call
+_UTC = dt.timezone.utc
+_DateTimeTZRange = psql_extras.DateTimeTZRange
 
 
 def effective_now() -> psql_extras.DateTimeTZRange:  # pragma: no cover
-    utc_now = dt.datetime.now(tz=dt.timezone.utc)
-    return psql_extras.DateTimeTZRange(utc_now, None)
+    return _DateTimeTZRange(dt.datetime.now(_UTC), None)
 
 
 def copy_column(column: sa.Column) -> sa.Column:
-    """copy a column, set some properties on it for history table creation"""
-    original = column
-    new = column.copy()
-    original.info['history_copy'] = new
-    for fk in column.foreign_keys:
-        new.append_foreign_key(sa.ForeignKey(fk.target_fullname))
-    new.unique = False
-    new.default = new.server_default = None
+    """copy a column, set some properties on it for history table creation
+
+    built fresh rather than via Column.copy(), which clones constraints,
+    defaults and info we immediately throw away"""
+    new = sa.Column(
+        column.name,
+        column.type,
+        *[sa.ForeignKey(fk.target_fullname) for fk in column.foreign_keys],
+        key=column.key,
+        nullable=column.nullable)
+    column.info['history_copy'] = new
 
     return new
 
 
+# postgres' identifier limit never changes at runtime, so resolve it once
+_MAX_IDENTIFIER_LENGTH = (sap.dialect.max_index_name_length
+                          or sap.dialect.max_identifier_length)
+
+
+@functools.lru_cache(maxsize=None)
 def truncate_identifier(identifier: str) -> str:
-    """ensure identifier doesn't exceed max characters postgres allows"""
-    max_len = (sap.dialect.max_index_name_length
-               or sap.dialect.max_identifier_length)
+    """ensure identifier doesn't exceed max characters postgres allows
+
+    memoized -- the same clock/history names are derived repeatedly
+    during mapping and this is a pure function of its input"""
+    max_len = _MAX_IDENTIFIER_LENGTH
     if len(identifier) > max_len:
         return "%s_%s" % (identifier[0:max_len - 8],
                           sa_util.md5_hex(identifier)[-4:])
     return identifier
 
 
+@functools.lru_cache(maxsize=None)
+def _activity_clock_backref(activity_cls, backref) -> orm.RelationshipProperty:
+    """ resolve (and then remember) the activity's clock relationship --
+    sa.inspect walks the mapper registry, no need to repeat that per tick """
+    return sa.inspect(activity_cls).relationships[backref]
+
+
 def get_activity_clock_backref(
         activity: bases.TemporalActivityMixin,
         entity: bases.Clocked) -> orm.RelationshipProperty:
     """Get the backref'd clock history for a given entity."""
+    options = entity.temporal_options
     assert (
-        activity is entity.temporal_options.activity_cls or
-        isinstance(activity, entity.temporal_options.activity_cls)
+        activity is options.activity_cls or
+        isinstance(activity, options.activity_cls)
     ), "cannot inspect %r for mapped activity %r" % (entity, activity)
 
-    inspected = sa.inspect(entity.temporal_options.activity_cls)
-    backref = entity.temporal_options.clock_table.activity.property.backref
-
-    return inspected.relationships[backref]
+    return _activity_clock_backref(
+        options.activity_cls,
+        options.clock_model.activity.property.backref)
 
 
+@functools.lru_cache(maxsize=None)
 def get_history_model(
         target: attributes.InstrumentedAttribute) -> bases.TemporalProperty:
-    """Get the history model for given entity class."""
+    """Get the history model for given entity class.
+
+    memoized -- instrumented attributes are per-class singletons and the
+    mapping never changes after class construction"""
     assert hasattr(target.class_, 'temporal_options')
 
-    return target.class_.temporal_options.history_tables[target.property]
+    return target.class_.temporal_options.history_models[target.property]
+
+
+def bulk_load_history(
+        session: orm.Session,
+        history_model: bases.TemporalProperty,
+        rows: typing.Iterable[dict]):
+    """Insert many history rows with a single Core executemany.
+
+    Backfill-sized loads pay heavily for per-object unit-of-work
+    bookkeeping; this skips the ORM entirely. ``rows`` are dicts keyed by
+    history-table column name -- psycopg2 adapts the ``effective``/
+    ``vclock`` range values natively, and the ``id`` column default still
+    applies per row."""
+    rows = list(rows)
+    if not rows:
+        return
+
+    session.execute(history_model.__table__.insert(), rows)